@@ -29,12 +29,140 @@ Usage:
 """
 
 import os
-import yaml
-import requests
+import re
+import copy
+import json
+import hashlib
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import cached_property, lru_cache
+from pathlib import PurePosixPath
 from typing import Optional
-from langfuse.decorators import observe
-from google import genai
+
+# yaml, requests and google.genai are imported where they're used: a
+# registry hit needs none of them, and the Gemini SDK is slow to import
+try:
+    from langfuse.decorators import observe
+except ImportError:
+    def observe(**kwargs):
+        return lambda f: f
+
+# orjson (optional) parses AI responses faster than the stdlib
+try:
+    import orjson
+    
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# Model used for AI role detection; also the version of cached verdicts
+_AI_MODEL = "gemini-2.0-flash"
+
+# Import targets in a diff ("import axios", "+from flask import ...")
+_IMPORT_RE = re.compile(r"^[+\- ]?\s*(?:import|from)\s+([\w.@/-]+)", re.MULTILINE)
+
+# Markdown code fence around an AI response; the JSON is whatever comes
+# between the opening fence (and optional "json" tag) and the next fence
+_FENCE_RE = re.compile(r"\s*```(?:json)?\s*(.*?)\s*(?:```|\Z)", re.DOTALL)
+
+# Diff budget for the detection prompt. Each file's diff is cut to its
+# first lines (header, imports, signatures carry the role signal) and files
+# are packed until the budget is used; ~4 characters per token, as elsewhere
+_DIFF_TOKEN_BUDGET = 2000
+_CHARS_PER_TOKEN = 4
+_DIFF_LINES_PER_FILE = 30
+_DIFF_FILE_RE = re.compile(r"^(?=diff --git )", re.MULTILINE)
+
+# Only confident verdicts are reused for structurally similar PRs
+_MIN_CACHED_CONFIDENCE = 0.8
+
+# Prompt for AI role detection; filled in by _build_detection_prompt
+_DETECTION_PROMPT_TEMPLATE = """You are analyzing a microservice to determine its role in contract testing.
+
+SERVICE NAME: {service_name}
+
+FILES CHANGED IN PR:
+{files}
+
+CODE CHANGES (DIFF):
+```
+{diff}
+```
+
+TASK: Determine if this service is a CONSUMER, PROVIDER, or BOTH.
+
+DEFINITIONS:
+- CONSUMER: Makes HTTP requests to OTHER services (has HTTP clients, API calls, fetch/axios usage)
+- PROVIDER: Exposes HTTP endpoints that OTHER services call (has routes, controllers, API handlers)
+
+INDICATORS:
+Consumer indicators:
+- Files like: **/clients/**, **/services/**, **/*Client.ts, **/*Api.ts
+- Imports: axios, fetch, http-client, request libraries
+- Code patterns: httpClient.get(), api.post(), fetch(), axios()
+
+Provider indicators:
+- Files like: **/routes/**, **/controllers/**, **/handlers/**, **/api/**
+- Imports: express, fastify, flask, spring controllers
+- Code patterns: app.get(), router.post(), @GetMapping, @Controller
+
+RESPONSE FORMAT (JSON only, no markdown):
+{{
+  "is_consumer": true/false,
+  "is_provider": true/false,
+  "consumer_of": ["service-name-1", "service-name-2"],
+  "provider_to": ["service-name-1"],
+  "confidence": 0.0-1.0,
+  "evidence": "Brief explanation of what indicated this"
+}}
+
+RULES:
+1. If you see HTTP client code making external calls → is_consumer = true
+2. If you see route/controller code exposing endpoints → is_provider = true
+3. A service CAN be both consumer and provider
+4. If you can identify specific service names being called, list them in consumer_of
+5. If unsure about specific names, use ["unknown-provider"] 
+6. Confidence should reflect how certain you are (0.5 = guess, 0.9 = confident)
+
+Respond with ONLY the JSON object, no explanation."""
+
+
+@lru_cache(maxsize=8)
+def _parse_registry(path: str, mtime_ns: int, size: int) -> dict:
+    """
+    Parse a service registry file, cached by path and stat signature.
+    
+    mtime_ns and size are part of the cache key so an edited (or re-saved)
+    registry is re-parsed; the returned dict is shared and must not be mutated.
+    """
+    import yaml
+    
+    # LibYAML's C loader when available
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    with open(path, 'r') as f:
+        return yaml.load(f, Loader=loader) or {"services": {}}
+
+
+def _summarize_diff(pr_diff: str) -> str:
+    """
+    Cut a diff down to the detection prompt's token budget.
+    
+    Keeps the first _DIFF_LINES_PER_FILE lines of each file's diff, in
+    order, and stops at a line boundary once the budget is reached.
+    """
+    budget = _DIFF_TOKEN_BUDGET * _CHARS_PER_TOKEN
+    kept = []
+    for file_diff in _DIFF_FILE_RE.split(pr_diff):
+        for line in file_diff.splitlines()[:_DIFF_LINES_PER_FILE]:
+            if len(line) + 1 > budget:
+                # A single huge line (e.g. minified code) still gets its head
+                if not kept:
+                    kept.append(line[:budget])
+                return "\n".join(kept)
+            budget -= len(line) + 1
+            kept.append(line)
+    return "\n".join(kept)
 
 
 @dataclass
@@ -44,7 +172,7 @@ class RoleDetectionResult:
     is_provider: bool
     consumer_of: list
     provider_to: list
-    source: str  # "registry", "broker", "ai", "fallback"
+    source: str  # "registry", "broker", "ai", "cache", "fallback"
     confidence: float
     evidence: Optional[str] = None
 
@@ -73,23 +201,72 @@ class RoleDetector:
         
         # Load registry
         self.registry = self._load_registry()
+    
+    @cached_property
+    def session(self):
+        """Keep-alive session so both broker lookups (and later detections
+        with this detector) reuse pooled TLS connections."""
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
         
-        # Initialize Gemini client for AI detection
-        if self.gemini_api_key:
-            self.genai_client = genai.Client(api_key=self.gemini_api_key)
+        session = requests.Session()
+        session.headers.update({
+            "Authorization": f"Bearer {self.pactflow_token}",
+            "Accept": "application/hal+json"
+        })
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=4,
+            max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=[502, 503, 504])
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+    
+    @cached_property
+    def genai_client(self):
+        """Gemini client for AI detection, created on first use."""
+        from google import genai
+        
+        return genai.Client(api_key=self.gemini_api_key)
     
     def _load_registry(self) -> dict:
         """Load the service registry from YAML file."""
-        if os.path.exists(self.registry_path):
-            with open(self.registry_path, 'r') as f:
-                return yaml.safe_load(f) or {"services": {}}
-        return {"services": {}}
+        try:
+            st = os.stat(self.registry_path)
+        except OSError:
+            return {"services": {}}
+        # Copy, since _update_registry edits self.registry in place
+        return copy.deepcopy(_parse_registry(self.registry_path, st.st_mtime_ns, st.st_size))
     
     def _save_registry(self):
         """Save the service registry to YAML file."""
-        os.makedirs(os.path.dirname(self.registry_path), exist_ok=True)
-        with open(self.registry_path, 'w') as f:
-            yaml.dump(self.registry, f, default_flow_style=False, sort_keys=False)
+        import yaml
+        
+        directory = os.path.dirname(self.registry_path) or "."
+        os.makedirs(directory, exist_ok=True)
+        # Write a temp file and swap it in, so a concurrent reader (or a
+        # crash mid-write) never sees a half-written registry
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                # LibYAML's C dumper when available
+                dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+                yaml.dump(self.registry, f, Dumper=dumper, default_flow_style=False, sort_keys=False)
+            try:
+                mode = os.stat(self.registry_path).st_mode & 0o777
+            except OSError:
+                mode = 0o644
+            os.chmod(tmp_path, mode)  # temp files are created owner-only
+            os.replace(tmp_path, self.registry_path)
+        except BaseException:
+            # Don't leave the partial temp file behind next to the registry
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
     
     @observe(name="detect_role")
     def detect_role(
@@ -120,8 +297,21 @@ class RoleDetector:
                 print(f"  ✅ Found in registry: consumer={result.is_consumer}, provider={result.is_provider}")
                 return result
         
-        # Step 2: Query Pact Broker
-        result = self._check_pact_broker(service_name)
+        # Step 2: Query Pact Broker, preparing the AI request (verdict lookup,
+        # prompt, Gemini SDK import) meanwhile. Gemini itself is only called
+        # once the broker has no answer: a started call can't be cancelled,
+        # so a broker hit never costs one
+        use_ai = bool(pr_files or pr_diff) and bool(self.gemini_api_key)
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            prepared = (
+                executor.submit(self._prepare_ai_detect, service_name, pr_files, pr_diff)
+                if use_ai else None
+            )
+            result = self._check_pact_broker(service_name)
+        finally:
+            # A broker hit doesn't wait for the preparation to finish
+            executor.shutdown(wait=False)
         if result and (result.is_consumer or result.is_provider):
             print(f"  ✅ Found in Pact Broker: consumer={result.is_consumer}, provider={result.is_provider}")
             # Update registry with broker findings
@@ -130,11 +320,16 @@ class RoleDetector:
         
         # Step 3: AI Analysis (if we have PR context)
         if pr_files or pr_diff:
-            result = self._ai_detect(service_name, pr_files, pr_diff)
+            result = self._ai_detect(
+                service_name, pr_files, pr_diff,
+                prepared=prepared.result() if prepared else None
+            )
             if result:
                 print(f"  ✅ AI detected: consumer={result.is_consumer}, provider={result.is_provider}")
-                # Update registry with AI findings
-                self._update_registry(service_name, result)
+                # Update registry with AI findings; a reused verdict wasn't
+                # derived from this PR, so it isn't made authoritative
+                if result.source != "cache":
+                    self._update_registry(service_name, result)
                 return result
         
         # Step 4: Fallback - ask for clarification
@@ -179,19 +374,25 @@ class RoleDetector:
             print("  ⚠️  Pact Broker credentials not configured")
             return None
         
-        headers = {
-            "Authorization": f"Bearer {self.pactflow_token}",
-            "Accept": "application/hal+json"
-        }
+        import requests
         
-        consumer_of = []
-        provider_to = []
+        consumer_of: set[str] = set()
+        provider_to: set[str] = set()
+        
+        # Check if this service is a PROVIDER (has consumers)
+        provider_url = f"{self.pactflow_url}/pacts/provider/{service_name}/latest"
+        # Check if this service is a CONSUMER (has providers)
+        # We need to check against known providers or all pacts
+        # For now, we check if any pacts exist where this is the consumer
+        consumer_url = f"{self.pactflow_url}/pacts/latest"
         
         try:
-            # Check if this service is a PROVIDER (has consumers)
-            provider_url = f"{self.pactflow_url}/pacts/provider/{service_name}/latest"
-            response = requests.get(provider_url, headers=headers, timeout=10)
+            # The two lookups are independent, so fetch them concurrently
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                provider_future = executor.submit(self.session.get, provider_url, timeout=10)
+                consumer_future = executor.submit(self.session.get, consumer_url, timeout=10)
             
+            response = provider_future.result()
             if response.status_code == 200:
                 data = response.json()
                 # Extract consumer names from pact links
@@ -200,33 +401,30 @@ class RoleDetector:
                     # Parse consumer name from pact link
                     name = pact.get("name", "")
                     if name:
-                        provider_to.append(name.split("/")[0] if "/" in name else name)
-            
-            # Check if this service is a CONSUMER (has providers)
-            # We need to check against known providers or all pacts
-            # For now, we check if any pacts exist where this is the consumer
-            consumer_url = f"{self.pactflow_url}/pacts/latest"
-            response = requests.get(consumer_url, headers=headers, timeout=10)
+                        provider_to.add(name.partition("/")[0])
             
+            response = consumer_future.result()
             if response.status_code == 200:
                 data = response.json()
                 pacts = data.get("pacts", [])
                 for pact in pacts:
-                    consumer = pact.get("_embedded", {}).get("consumer", {}).get("name", "")
-                    provider = pact.get("_embedded", {}).get("provider", {}).get("name", "")
+                    embedded = pact.get("_embedded") or {}
+                    consumer = (embedded.get("consumer") or {}).get("name")
+                    provider = (embedded.get("provider") or {}).get("name")
                     
-                    if consumer == service_name:
-                        consumer_of.append(provider)
+                    if consumer == service_name and provider:
+                        consumer_of.add(provider)
             
             if consumer_of or provider_to:
+                consumers_of, providers_to = list(consumer_of), list(provider_to)
                 return RoleDetectionResult(
-                    is_consumer=len(consumer_of) > 0,
-                    is_provider=len(provider_to) > 0,
-                    consumer_of=list(set(consumer_of)),
-                    provider_to=list(set(provider_to)),
+                    is_consumer=len(consumers_of) > 0,
+                    is_provider=len(providers_to) > 0,
+                    consumer_of=consumers_of,
+                    provider_to=providers_to,
                     source="broker",
                     confidence=1.0,
-                    evidence=f"Found in Pact Broker: consumes {consumer_of}, provides to {provider_to}"
+                    evidence=f"Found in Pact Broker: consumes {consumers_of}, provides to {providers_to}"
                 )
         
         except requests.RequestException as e:
@@ -234,33 +432,145 @@ class RoleDetector:
         
         return None
     
+    def _prepare_ai_detect(
+        self,
+        service_name: str,
+        pr_files: list,
+        pr_diff: str
+    ) -> tuple[Optional[str], Optional[RoleDetectionResult], Optional[str]]:
+        """
+        Do the work of AI detection that comes before the Gemini call.
+        
+        Returns:
+            (fingerprint, reused verdict or None, prompt or None if a
+            verdict is reused)
+        """
+        # Reuse this service's verdict for a PR with the same shape, if we have one
+        fingerprint = self._structural_fingerprint(service_name, pr_files, pr_diff)
+        cached = self._get_cached_verdict(fingerprint)
+        if cached is not None:
+            return fingerprint, cached, None
+        
+        prompt = self._build_detection_prompt(service_name, pr_files, pr_diff)
+        try:
+            self.genai_client  # imports the (slow) SDK ahead of the call
+        except Exception:
+            pass  # not cached, so the call below raises and reports it
+        return fingerprint, None, prompt
+    
     @observe(name="ai_detect_role")
     def _ai_detect(
         self,
         service_name: str,
         pr_files: list,
-        pr_diff: str
+        pr_diff: str,
+        prepared: Optional[tuple] = None
     ) -> Optional[RoleDetectionResult]:
-        """Use AI to detect service role from PR changes."""
+        """
+        Use AI to detect service role from PR changes.
+        
+        Args:
+            prepared: _prepare_ai_detect()'s result, if it already ran
+        """
         if not self.gemini_api_key:
             print("  ⚠️  Gemini API key not configured")
             return None
         
-        # Build the prompt
-        prompt = self._build_detection_prompt(service_name, pr_files, pr_diff)
+        fingerprint, cached, prompt = prepared or self._prepare_ai_detect(
+            service_name, pr_files, pr_diff
+        )
+        if cached is not None:
+            print("  ♻️  Reusing AI verdict for a structurally identical PR")
+            return cached
         
         try:
             response = self.genai_client.models.generate_content(
-                model="gemini-2.0-flash",
+                model=_AI_MODEL,
                 contents=prompt
             )
             
             # Parse AI response
-            return self._parse_ai_response(response.text, service_name)
+            result = self._parse_ai_response(response.text, service_name)
         
         except Exception as e:
             print(f"  ⚠️  AI detection error: {e}")
             return None
+        
+        self._put_cached_verdict(fingerprint, result)
+        return result
+    
+    def _structural_fingerprint(
+        self,
+        service_name: str,
+        pr_files: list,
+        pr_diff: str
+    ) -> Optional[str]:
+        """
+        Hash the shape of a PR rather than its exact contents.
+        
+        The shape is the set of top-level directory pairs of the changed
+        files (e.g. src/clients) plus the first 20 modules imported in the
+        diff, which is what the role verdict actually depends on. The service
+        name is part of the key, so a verdict (and the service names in it)
+        is only reused for the service it was made for.
+        
+        Returns:
+            Hex digest, or None if the PR has no structure to key on
+        """
+        signature = {
+            "/".join(PurePosixPath(f).parts[:2]) for f in (pr_files or [])
+        }
+        signature.update(
+            f"import:{name}" for name in _IMPORT_RE.findall(pr_diff or "")[:20]
+        )
+        if not signature:
+            return None
+        key = json.dumps([service_name, sorted(signature)])
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+    
+    def _get_cached_verdict(self, fingerprint: Optional[str]) -> Optional[RoleDetectionResult]:
+        """Return a stored AI verdict for this PR shape, if any."""
+        if fingerprint is None:
+            return None
+        from src import _cache
+        
+        verdict = _cache.get("roles", fingerprint, _AI_MODEL)
+        if verdict is None:
+            return None
+        is_consumer, is_provider, consumer_of, provider_to, confidence, evidence = verdict
+        return RoleDetectionResult(
+            is_consumer=is_consumer,
+            is_provider=is_provider,
+            consumer_of=consumer_of,
+            provider_to=provider_to,
+            source="cache",
+            confidence=confidence,
+            evidence=evidence
+        )
+    
+    def _put_cached_verdict(
+        self,
+        fingerprint: Optional[str],
+        result: Optional[RoleDetectionResult]
+    ) -> None:
+        """Store a confident AI verdict for this service and PR shape."""
+        if fingerprint is None or result is None or result.confidence < _MIN_CACHED_CONFIDENCE:
+            return
+        from src import _cache
+        
+        _cache.put(
+            "roles",
+            fingerprint,
+            _AI_MODEL,
+            (
+                result.is_consumer,
+                result.is_provider,
+                result.consumer_of,
+                result.provider_to,
+                result.confidence,
+                result.evidence
+            )
+        )
     
     def _build_detection_prompt(
         self,
@@ -269,54 +579,11 @@ class RoleDetector:
         pr_diff: str
     ) -> str:
         """Build the prompt for AI role detection."""
-        return f"""You are analyzing a microservice to determine its role in contract testing.
-
-SERVICE NAME: {service_name}
-
-FILES CHANGED IN PR:
-{chr(10).join(f'- {f}' for f in (pr_files or []))}
-
-CODE CHANGES (DIFF):
-```
-{pr_diff[:5000] if pr_diff else "No diff provided"}
-```
-
-TASK: Determine if this service is a CONSUMER, PROVIDER, or BOTH.
-
-DEFINITIONS:
-- CONSUMER: Makes HTTP requests to OTHER services (has HTTP clients, API calls, fetch/axios usage)
-- PROVIDER: Exposes HTTP endpoints that OTHER services call (has routes, controllers, API handlers)
-
-INDICATORS:
-Consumer indicators:
-- Files like: **/clients/**, **/services/**, **/*Client.ts, **/*Api.ts
-- Imports: axios, fetch, http-client, request libraries
-- Code patterns: httpClient.get(), api.post(), fetch(), axios()
-
-Provider indicators:
-- Files like: **/routes/**, **/controllers/**, **/handlers/**, **/api/**
-- Imports: express, fastify, flask, spring controllers
-- Code patterns: app.get(), router.post(), @GetMapping, @Controller
-
-RESPONSE FORMAT (JSON only, no markdown):
-{{
-  "is_consumer": true/false,
-  "is_provider": true/false,
-  "consumer_of": ["service-name-1", "service-name-2"],
-  "provider_to": ["service-name-1"],
-  "confidence": 0.0-1.0,
-  "evidence": "Brief explanation of what indicated this"
-}}
-
-RULES:
-1. If you see HTTP client code making external calls → is_consumer = true
-2. If you see route/controller code exposing endpoints → is_provider = true
-3. A service CAN be both consumer and provider
-4. If you can identify specific service names being called, list them in consumer_of
-5. If unsure about specific names, use ["unknown-provider"] 
-6. Confidence should reflect how certain you are (0.5 = guess, 0.9 = confident)
-
-Respond with ONLY the JSON object, no explanation."""
+        return _DETECTION_PROMPT_TEMPLATE.format(
+            service_name=service_name,
+            files="\n".join(f"- {f}" for f in (pr_files or [])),
+            diff=_summarize_diff(pr_diff) if pr_diff else "No diff provided"
+        )
     
     def _parse_ai_response(
         self,
@@ -324,18 +591,12 @@ Respond with ONLY the JSON object, no explanation."""
         service_name: str
     ) -> Optional[RoleDetectionResult]:
         """Parse the AI response into a RoleDetectionResult."""
-        import json
-        
         try:
             # Clean up response (remove markdown code blocks if present)
-            text = response_text.strip()
-            if text.startswith("```"):
-                text = text.split("```")[1]
-                if text.startswith("json"):
-                    text = text[4:]
-            text = text.strip()
+            fenced = _FENCE_RE.match(response_text)
+            text = fenced.group(1) if fenced else response_text.strip()
             
-            data = json.loads(text)
+            data = _json_loads(text)
             
             return RoleDetectionResult(
                 is_consumer=data.get("is_consumer", False),
@@ -407,6 +668,9 @@ def detect_service_role(
 if __name__ == "__main__":
     # Test the detector
     import sys
+    from src import configure_logging
+    
+    configure_logging()
     
     if len(sys.argv) < 2:
         print("Usage: python role_detector.py <service-name>")
@@ -2,3 +2,43 @@
 AI Contract Testing - Main Package
 ==================================
 """
+
+import os
+import sys
+import logging
+
+
+class _ConsoleFormatter(logging.Formatter):
+    """Bare messages; warnings and errors get a [WARN] / [ERROR] tag after
+    the message's indentation, so call sites don't repeat the level."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = super().format(record)
+        if record.levelno >= logging.ERROR:
+            tag = "[ERROR]"
+        elif record.levelno >= logging.WARNING:
+            tag = "[WARN]"
+        else:
+            return message
+        body = message.lstrip(" ")
+        return f"{message[:len(message) - len(body)]}{tag} {body}"
+
+
+def configure_logging() -> None:
+    """
+    Print this package's log records to stdout, for the CLI entry points.
+
+    Only the "src" logger hierarchy is configured (level from LOG_LEVEL,
+    default INFO); third-party loggers (httpx, urllib3, google-genai) keep
+    Python's defaults. Safe to call more than once.
+    """
+    logger = logging.getLogger(__name__)
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(_ConsoleFormatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.propagate = False
+    try:
+        logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    except ValueError:
+        logger.setLevel(logging.INFO)
@@ -0,0 +1,74 @@
+"""
+Collector Response Cache
+========================
+On-disk cache for collected contexts, so re-running the pipeline on an
+unchanged PR, ticket or spec file reads from disk instead of the network
+or the YAML parser.
+
+Enabled by setting CONTEXT_CACHE_DIR; without it every call is a miss.
+Entries are stored with a version string (PR head/updated_at, ticket
+updated timestamp, spec file mtime/size, commit or blob SHA for files
+fetched from GitHub) and only returned while that version still matches.
+"""
+
+import logging
+import shelve
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+from . import _env
+
+# Bump when the cached context classes change shape so stale pickles are ignored
+_SCHEMA = 5
+
+_lock = threading.Lock()
+
+log = logging.getLogger(__name__)
+
+
+def _path(namespace: str) -> Optional[Path]:
+    cache_dir = _env.load()["CONTEXT_CACHE_DIR"]
+    if not cache_dir:
+        return None
+    directory = Path(cache_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory / namespace
+
+
+def get(namespace: str, key: str, version: str) -> Any:
+    """
+    Return the cached value for key if it was stored with this version.
+
+    Args:
+        namespace: Cache file name (e.g. "github", "jira")
+        key: Entry key (e.g. "owner/repo#12", "PROJ-123")
+        version: Current upstream version of the entry
+
+    Returns:
+        The cached value, or None on a miss or when caching is disabled
+    """
+    path = _path(namespace)
+    if path is None or not version:
+        return None
+    try:
+        with _lock, shelve.open(str(path), flag="c") as db:
+            entry = db.get(key)
+    except Exception as e:
+        log.warning("  Could not read context cache: %s", e)
+        return None
+    if entry and entry[0] == (_SCHEMA, version):
+        return entry[1]
+    return None
+
+
+def put(namespace: str, key: str, version: str, value: Any) -> None:
+    """Store value under key for this version (no-op when caching is disabled)."""
+    path = _path(namespace)
+    if path is None or not version:
+        return
+    try:
+        with _lock, shelve.open(str(path), flag="c") as db:
+            db[key] = ((_SCHEMA, version), value)
+    except Exception as e:
+        log.warning("  Could not write context cache: %s", e)
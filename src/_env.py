@@ -0,0 +1,60 @@
+"""
+Collector Environment
+=====================
+Loads .env once and exposes the settings the collectors read.
+"""
+
+import os
+import logging
+from functools import lru_cache
+from dotenv import load_dotenv
+
+# API_TIMEOUT_SECONDS when unset or not a positive number
+_DEFAULT_TIMEOUT_SECONDS = 30
+
+log = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=1)
+def _load_dotenv() -> None:
+    """Load .env into os.environ (first call only)."""
+    load_dotenv()
+
+
+def _timeout(value: str | None) -> int:
+    """Parse API_TIMEOUT_SECONDS, falling back to the default if malformed."""
+    if not value:
+        return _DEFAULT_TIMEOUT_SECONDS
+    try:
+        timeout = int(value)
+    except ValueError:
+        log.warning("Ignoring invalid API_TIMEOUT_SECONDS=%r, using %ds", value, _DEFAULT_TIMEOUT_SECONDS)
+        return _DEFAULT_TIMEOUT_SECONDS
+    return timeout if timeout > 0 else _DEFAULT_TIMEOUT_SECONDS
+
+
+def load() -> dict:
+    """
+    Return the collector settings, read from the environment on each call.
+
+    .env is loaded on the first call only, but os.environ is read every
+    time, so variables exported (or patched) after import are picked up.
+
+    Returns:
+        Dict of environment values keyed by variable name. Missing
+        credentials are None; API_TIMEOUT_SECONDS is an int (default 30)
+        and JIRA_KEEP_RAW a bool.
+    """
+    _load_dotenv()
+    get = os.environ.get
+    return {
+        "GITHUB_TOKEN": get("GITHUB_TOKEN"),
+        "JIRA_BASE_URL": get("JIRA_BASE_URL"),
+        "JIRA_EMAIL": get("JIRA_EMAIL"),
+        "JIRA_API_TOKEN": get("JIRA_API_TOKEN"),
+        "JIRA_KEEP_RAW": get("JIRA_KEEP_RAW", "").lower() in ("1", "true", "yes"),
+        "PACTFLOW_BASE_URL": get("PACTFLOW_BASE_URL"),
+        "PACTFLOW_TOKEN": get("PACTFLOW_TOKEN"),
+        "API_TIMEOUT_SECONDS": _timeout(get("API_TIMEOUT_SECONDS")),
+        "CONTEXT_CACHE_DIR": get("CONTEXT_CACHE_DIR"),
+    }
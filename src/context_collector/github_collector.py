@@ -9,18 +9,68 @@ This module extracts context from Pull Requests including:
 - Commit history
 """
 
-import os
+import io
+import json
+import logging
 import re
-from typing import Optional
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import ClassVar, Optional
 from dataclasses import dataclass, field
-from dotenv import load_dotenv
+from functools import cached_property
 from github import Github, Auth
 from langfuse import observe, get_client
 
-load_dotenv()
+from src import _cache, _env
 
+_env.load()
 
-@dataclass
+log = logging.getLogger(__name__)
+
+# JIRA ticket key pattern: ABC-123, PROJ-1, etc.
+_TICKET_KEY_RE = re.compile(r'[A-Z]+-\d+')
+# Branch names are often lowercase; match case-insensitively instead of
+# upper-casing the whole branch name first
+_BRANCH_TICKET_KEY_RE = re.compile(r'[A-Z]+-\d+', re.IGNORECASE | re.ASCII)
+
+# Number of API-relevant diffs shown in the AI context
+_MAX_API_DIFFS = 3
+# Characters of each review comment shown in the AI context
+_MAX_REVIEW_COMMENT_CHARS = 300
+
+
+@dataclass(frozen=True, slots=True)
+class ChangedFile:
+    """A file changed in the PR."""
+    filename: str
+    status: str  # added, modified, removed, renamed
+    additions: int
+    deletions: int
+    patch: str = ""
+    is_api_relevant: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class Commit:
+    """A commit on the PR branch."""
+    sha: str  # Short SHA
+    message: str
+    first_line: str  # Subject line for summaries
+    author: str
+
+
+@dataclass(frozen=True, slots=True)
+class ReviewComment:
+    """A review comment left on the PR."""
+    author: str
+    body: str
+    path: str
+    created_at: str = ""
+    # Body truncated for the AI context, computed once at extraction
+    excerpt: str = ""
+
+
+@dataclass(frozen=True)
 class GitHubContext:
     """Structured container for GitHub PR information."""
     pr_number: int
@@ -31,66 +81,90 @@ class GitHubContext:
     target_branch: str
     author: str
     labels: list[str] = field(default_factory=list)
-    changed_files: list[dict] = field(default_factory=list)
-    commits: list[dict] = field(default_factory=list)
-    review_comments: list[dict] = field(default_factory=list)
+    changed_files: list[ChangedFile] = field(default_factory=list)
+    commits: list[Commit] = field(default_factory=list)
+    review_comments: list[ReviewComment] = field(default_factory=list)
     extracted_ticket_key: Optional[str] = None
+    # First few API-relevant files, picked at extraction (None = derive from changed_files)
+    api_relevant_files: Optional[list[ChangedFile]] = None
 
     def format_for_ai(self) -> str:
         """Format GitHub context into a string optimized for AI consumption."""
-        sections = []
-        
-        # Header
-        sections.append(f"## GitHub PR #{self.pr_number}")
-        sections.append(f"**Title:** {self.title}")
-        sections.append(f"**Author:** {self.author}")
-        sections.append(f"**State:** {self.state}")
-        sections.append(f"**Branch:** {self.source_branch} -> {self.target_branch}")
+        return self.formatted
+    
+    def format_for_ai_bytes(self) -> bytes:
+        """UTF-8 encoded format_for_ai() output, for callers writing to a socket or file."""
+        return self.formatted_bytes
+    
+    @cached_property
+    def formatted_bytes(self) -> bytes:
+        """Encoded AI context (encoded once, then cached alongside the string)."""
+        return self.formatted.encode("utf-8")
+    
+    @cached_property
+    def formatted(self) -> str:
+        """
+        AI-formatted context, built once per instance.
         
+        The context is frozen after collection, so the cached string never goes stale.
+        """
+        # Sections are emitted in a fixed order, so write them straight into
+        # one growing buffer instead of building and joining per-section strings
+        out = io.StringIO()
+        write = out.write
+        
+        write(
+            f"## GitHub PR #{self.pr_number}\n"
+            f"**Title:** {self.title}\n"
+            f"**Author:** {self.author}\n"
+            f"**State:** {self.state}\n"
+            f"**Branch:** {self.source_branch} -> {self.target_branch}"
+        )
         if self.extracted_ticket_key:
-            sections.append(f"**Linked Ticket:** {self.extracted_ticket_key}")
-        
+            write(f"\n**Linked Ticket:** {self.extracted_ticket_key}")
         if self.labels:
-            sections.append(f"**Labels:** {', '.join(self.labels)}")
+            write(f"\n**Labels:** {', '.join(self.labels)}")
         
         # PR Description
         if self.description:
-            sections.append(f"\n### PR Description\n{self.description}")
+            write(f"\n\n### PR Description\n{self.description}")
         
         # Changed Files Summary
         if self.changed_files:
-            sections.append(f"\n### Changed Files ({len(self.changed_files)} files)")
+            write(f"\n\n### Changed Files ({len(self.changed_files)} files)")
             for file in self.changed_files:
-                sections.append(f"- `{file['filename']}` ({file['status']}: +{file['additions']}/-{file['deletions']})")
+                write(f"\n- `{file.filename}` ({file.status}: +{file.additions}/-{file.deletions})")
         
         # Diffs (limited to most relevant files)
-        api_files = [f for f in self.changed_files if self._is_api_relevant_file(f['filename'])]
+        api_files = self.api_relevant_files
+        if api_files is None:
+            api_files = [f for f in self.changed_files if self._is_api_relevant_file(f.filename)][:_MAX_API_DIFFS]
         if api_files:
-            sections.append(f"\n### API-Relevant Changes")
-            for file in api_files[:3]:  # Limit to 3 files
-                sections.append(f"\n#### {file['filename']}")
-                sections.append(f"```diff\n{file['patch']}\n```")
+            write("\n\n### API-Relevant Changes")
+            for file in api_files:
+                write(f"\n\n#### {file.filename}\n```diff\n{file.patch}\n```")
         
         # Commits
         if self.commits:
-            sections.append(f"\n### Commits ({len(self.commits)} total)")
+            write(f"\n\n### Commits ({len(self.commits)} total)")
             for commit in self.commits[-5:]:  # Last 5 commits
-                sections.append(f"- `{commit['sha']}` {commit['message'].split(chr(10))[0]}")
+                write(f"\n- `{commit.sha}` {commit.first_line}")
         
         # Review Comments
         if self.review_comments:
-            sections.append(f"\n### Review Comments ({len(self.review_comments)} total)")
+            write(f"\n\n### Review Comments ({len(self.review_comments)} total)")
             for comment in self.review_comments[-3:]:  # Last 3 comments
-                body = comment['body'][:300] if len(comment['body']) > 300 else comment['body']
-                sections.append(f"\n**{comment['author']}** on `{comment['path']}`:\n{body}")
+                write(f"\n\n**{comment.author}** on `{comment.path}`:\n{comment.excerpt}")
         
-        formatted = "\n".join(sections)
-        return formatted
+        return out.getvalue()
     
     # Class-level cache for API-relevant patterns to avoid reloading config repeatedly
-    _api_relevant_patterns_cache: Optional[list[str]] = None
+    _api_relevant_patterns_cache: ClassVar[Optional[list[str]]] = None
+    # All patterns compiled into one alternation so each filename is scanned once
+    _api_relevant_re_cache: ClassVar[Optional[re.Pattern]] = None
     
-    def _is_api_relevant_file(self, filename: str) -> bool:
+    @staticmethod
+    def _is_api_relevant_file(filename: str) -> bool:
         """
         Check if a file is likely API-relevant for contract testing.
         
@@ -99,9 +173,8 @@ class GitHubContext:
         # Load patterns from config (cached to avoid repeated file reads)
         if GitHubContext._api_relevant_patterns_cache is None:
             try:
-                from src.context_processor.repo_analyzer import RepoAnalyzer
-                analyzer = RepoAnalyzer()
-                github_config = analyzer.config.get("github_pr", {})
+                from src.context_processor.repo_analyzer import load_detection_config
+                github_config = load_detection_config().get("github_pr", {})
                 GitHubContext._api_relevant_patterns_cache = github_config.get("api_relevant_patterns", [
                     'openapi', 'swagger', 'api-spec',
                     'route', 'controller', 'handler',
@@ -117,8 +190,13 @@ class GitHubContext:
                     'endpoint', 'service'
                 ]
         
-        filename_lower = filename.lower()
-        return any(pattern in filename_lower for pattern in GitHubContext._api_relevant_patterns_cache)
+        if GitHubContext._api_relevant_re_cache is None:
+            patterns = GitHubContext._api_relevant_patterns_cache
+            GitHubContext._api_relevant_re_cache = re.compile(
+                "|".join(map(re.escape, patterns)) if patterns else "(?!)"
+            )
+        
+        return GitHubContext._api_relevant_re_cache.search(filename.lower()) is not None
 
 
 class GitHubCollector:
@@ -131,15 +209,40 @@ class GitHubCollector:
         formatted = context.format_for_ai()
     """
     
+    # Class-level cache for GitHub PR config to avoid reloading config repeatedly
+    _github_config_cache: Optional[dict] = None
+    
+    @classmethod
+    def _get_github_config(cls) -> dict:
+        """Get GitHub PR config from detection.yaml (cached)."""
+        if cls._github_config_cache is None:
+            try:
+                from src.context_processor.repo_analyzer import load_detection_config
+                cls._github_config_cache = load_detection_config().get("github_pr", {})
+            except Exception:
+                cls._github_config_cache = {}
+        return cls._github_config_cache
+    
+    @classmethod
+    def _github_config_fingerprint(cls) -> str:
+        """
+        Short hash of the github_pr config (max_files, max_patch_size,
+        api_relevant_patterns), which shapes the collected context.
+        """
+        config = json.dumps(cls._get_github_config(), sort_keys=True, default=str)
+        return hashlib.sha256(config.encode("utf-8")).hexdigest()[:16]
+    
     def __init__(self):
         """Initialize GitHub client with token from environment."""
-        token = os.getenv("GITHUB_TOKEN")
+        token = _env.load()["GITHUB_TOKEN"]
         
         if not token:
             raise ValueError("Missing environment variable: GITHUB_TOKEN")
         
         auth = Auth.Token(token)
-        self.client = Github(auth=auth)
+        # Use the maximum page size so large PRs need fewer round trips, and a
+        # connection pool big enough for the concurrent sub-resource fetches
+        self.client = Github(auth=auth, per_page=100, pool_size=10)
     
     @observe(name="github_collect")
     def collect(self, repo_full_name: str, pr_number: int) -> GitHubContext:
@@ -153,7 +256,7 @@ class GitHubCollector:
         Returns:
             GitHubContext object with structured PR information
         """
-        print(f"[GitHub] Fetching PR: {repo_full_name}#{pr_number}")
+        log.info("[GitHub] Fetching PR: %s#%s", repo_full_name, pr_number)
         
         try:
             get_client().update_current_span(
@@ -166,6 +269,19 @@ class GitHubCollector:
         repo = self.client.get_repo(repo_full_name)
         pr = repo.get_pull(pr_number)
         
+        # Pushes, edits and comments all bump updated_at, so an unchanged
+        # (head, updated_at) pair means the PR itself is unchanged; the
+        # github_pr config decides which files and how much diff are kept
+        cache_key = f"{repo_full_name}#{pr_number}"
+        cache_version = (
+            f"{pr.head.sha}@{pr.updated_at.isoformat() if pr.updated_at else ''}"
+            f"#{self._github_config_fingerprint()}"
+        )
+        cached = _cache.get("github", cache_key, cache_version)
+        if cached is not None:
+            log.info("  [OK] PR unchanged since last run, using cached context")
+            return cached
+        
         # Extract basic PR info
         title = pr.title
         description = pr.body or ""
@@ -178,14 +294,21 @@ class GitHubCollector:
         # Extract ticket key from title or branch (e.g., "PROJ-123" from "PROJ-123: Add feature")
         extracted_ticket_key = self._extract_ticket_key(title, source_branch)
         
-        # Get changed files with diffs
-        changed_files = self._extract_changed_files(pr)
-        
-        # Get commit history
-        commits = self._extract_commits(pr)
-        
-        # Get review comments
-        review_comments = self._extract_review_comments(pr)
+        # Files, commits and review comments are independent paginated
+        # endpoints, so fetch them concurrently instead of back-to-back
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            files_future = executor.submit(self._extract_changed_files, pr)
+            commits_future = executor.submit(self._extract_commits, pr)
+            comments_future = executor.submit(self._extract_review_comments, pr)
+            
+            # Get changed files with diffs
+            changed_files, api_relevant_files = files_future.result()
+            
+            # Get commit history
+            commits = commits_future.result()
+            
+            # Get review comments
+            review_comments = comments_future.result()
         
         context = GitHubContext(
             pr_number=pr_number,
@@ -199,8 +322,10 @@ class GitHubCollector:
             changed_files=changed_files,
             commits=commits,
             review_comments=review_comments,
-            extracted_ticket_key=extracted_ticket_key
+            extracted_ticket_key=extracted_ticket_key,
+            api_relevant_files=api_relevant_files
         )
+        _cache.put("github", cache_key, cache_version, context)
         
         try:
             get_client().update_current_span(
@@ -215,7 +340,8 @@ class GitHubCollector:
         except Exception:
             pass
         
-        print(f"  [OK] Collected context for: {title[:50]}...")
+        if log.isEnabledFor(logging.INFO):
+            log.info("  [OK] Collected context for: %s...", title[:50])
         return context
     
     def _extract_ticket_key(self, title: str, branch: str) -> Optional[str]:
@@ -227,22 +353,19 @@ class GitHubCollector:
         - "feature/PROJ-123-add-feature" (branch)
         - "[PROJ-123] Add feature" (title)
         """
-        # Pattern matches: ABC-123, PROJ-1, etc.
-        pattern = r'([A-Z]+-\d+)'
-        
         # Try title first
-        match = re.search(pattern, title)
+        match = _TICKET_KEY_RE.search(title)
         if match:
-            return match.group(1)
+            return match.group(0)
         
         # Try branch name
-        match = re.search(pattern, branch.upper())
+        match = _BRANCH_TICKET_KEY_RE.search(branch)
         if match:
-            return match.group(1)
+            return match.group(0).upper()
         
         return None
     
-    def _extract_changed_files(self, pr) -> list[dict]:
+    def _extract_changed_files(self, pr) -> tuple[list[ChangedFile], list[ChangedFile]]:
         """
         Extract changed files with their diffs.
         
@@ -250,26 +373,54 @@ class GitHubCollector:
         - Which files changed
         - What type of change (added, modified, deleted)
         - The actual diff (limited to avoid token explosion)
+        
+        Only the diffs that format_for_ai actually shows (the first few
+        API-relevant files) are kept; other files get an empty patch so large
+        PRs don't pin megabytes of diff text in memory.
+        
+        Returns:
+            Tuple of (all changed files, the API-relevant files shown with diffs)
+        
+        Note: Limits are configured in detection.yaml under github_pr
+        (max_files, max_patch_size)
         """
         files = []
+        api_files = []
+        github_config = self._get_github_config()
+        max_files = github_config.get("max_files", 300)
+        max_patch_size = github_config.get("max_patch_size", 2000)
         
         for file in pr.get_files():
-            # Limit patch size to avoid huge diffs
-            patch = file.patch or ""
-            if len(patch) > 2000:
-                patch = patch[:2000] + "\n... [truncated]"
+            # Stop paging once we have enough files for the AI context
+            if len(files) >= max_files:
+                break
+            
+            # Classify once here so formatting never re-scans the file list
+            is_api = GitHubContext._is_api_relevant_file(file.filename)
+            keep_diff = is_api and len(api_files) < _MAX_API_DIFFS
+            
+            patch = ""
+            if keep_diff:
+                # Limit patch size to avoid huge diffs
+                patch = file.patch or ""
+                if len(patch) > max_patch_size:
+                    patch = patch[:max_patch_size] + "\n... [truncated]"
             
-            files.append({
-                "filename": file.filename,
-                "status": file.status,  # added, modified, removed, renamed
-                "additions": file.additions,
-                "deletions": file.deletions,
-                "patch": patch
-            })
-        
-        return files
+            changed = ChangedFile(
+                filename=file.filename,
+                status=file.status,
+                additions=file.additions,
+                deletions=file.deletions,
+                patch=patch,
+                is_api_relevant=is_api
+            )
+            files.append(changed)
+            if keep_diff:
+                api_files.append(changed)
+        
+        return files, api_files
     
-    def _extract_commits(self, pr) -> list[dict]:
+    def _extract_commits(self, pr) -> list[Commit]:
         """
         Extract commit history for the PR.
         
@@ -278,15 +429,17 @@ class GitHubCollector:
         commits = []
         
         for commit in pr.get_commits():
-            commits.append({
-                "sha": commit.sha[:7],  # Short SHA
-                "message": commit.commit.message or "",
-                "author": commit.commit.author.name if commit.commit.author else "Unknown"
-            })
+            message = commit.commit.message or ""
+            commits.append(Commit(
+                sha=commit.sha[:7],
+                message=message,
+                first_line=message.partition("\n")[0],
+                author=commit.commit.author.name if commit.commit.author else "Unknown"
+            ))
         
         return commits
     
-    def _extract_review_comments(self, pr) -> list[dict]:
+    def _extract_review_comments(self, pr) -> list[ReviewComment]:
         """
         Extract review comments from the PR.
         
@@ -297,13 +450,15 @@ class GitHubCollector:
         
         try:
             for comment in pr.get_review_comments():
-                comments.append({
-                    "author": comment.user.login,
-                    "body": comment.body,
-                    "path": comment.path,
-                    "created_at": comment.created_at.isoformat() if comment.created_at else ""
-                })
+                body = comment.body or ""
+                comments.append(ReviewComment(
+                    author=comment.user.login,
+                    body=body,
+                    path=comment.path,
+                    created_at=comment.created_at.isoformat() if comment.created_at else "",
+                    excerpt=body[:_MAX_REVIEW_COMMENT_CHARS],
+                ))
         except Exception as e:
-            print(f"  [WARN] Could not fetch review comments: {e}")
+            log.warning("  Could not fetch review comments: %s", e)
         
         return comments
\ No newline at end of file
@@ -4,16 +4,29 @@ JIRA Context Collector
 Fetches and structures JIRA ticket information for AI consumption.
 """
 
-import os
+import logging
+import re
 from typing import Optional
 from dataclasses import dataclass, field
-from dotenv import load_dotenv
+from functools import cached_property
+import requests
+from requests.adapters import HTTPAdapter
 from langfuse import observe, get_client
 
-load_dotenv()
+from src import _cache, _env
 
+_env.load()
 
-@dataclass
+log = logging.getLogger(__name__)
+
+# Heading that starts the acceptance criteria section in free-text descriptions
+_AC_HEADING_RE = re.compile(r"acceptance criteria", re.IGNORECASE)
+
+# Characters of each comment shown in the AI context
+_MAX_COMMENT_CHARS = 500
+
+
+@dataclass(frozen=True)
 class JiraContext:
     """Structured container for JIRA ticket information."""
     ticket_key: str
@@ -26,50 +39,68 @@ class JiraContext:
     comments: list[dict] = field(default_factory=list)
     parent_epic: Optional[dict] = None
     linked_issues: list[dict] = field(default_factory=list)
-    raw_response: dict = field(default_factory=dict)
+    # Full issue payload, only kept when JIRA_KEEP_RAW is set (debugging)
+    raw_response: Optional[dict] = None
 
     def format_for_ai(self) -> str:
         """Format JIRA context into a string optimized for AI consumption."""
-        sections = []
-        
-        # Header
-        sections.append(f"## JIRA Ticket: {self.ticket_key}")
-        sections.append(f"**Type:** {self.issue_type}")
-        sections.append(f"**Status:** {self.status}")
-        sections.append(f"**Summary:** {self.summary}")
-        
-        if self.labels:
-            sections.append(f"**Labels:** {', '.join(self.labels)}")
+        return self.formatted
+    
+    def format_for_ai_bytes(self) -> bytes:
+        """UTF-8 encoded format_for_ai() output, for callers writing to a socket or file."""
+        return self.formatted_bytes
+    
+    @cached_property
+    def formatted_bytes(self) -> bytes:
+        """Encoded ticket context (encoded once, then cached alongside the string)."""
+        return self.formatted.encode("utf-8")
+    
+    @cached_property
+    def formatted(self) -> str:
+        """AI-formatted ticket context (computed on first access, then cached)."""
+        labels_block = f"\n**Labels:** {', '.join(self.labels)}" if self.labels else ""
         
         # Description
-        if self.description:
-            sections.append(f"\n### Description\n{self.description}")
+        description_block = f"\n\n### Description\n{self.description}" if self.description else ""
         
         # Acceptance Criteria (only shown if not already in description)
+        ac_block = ""
         if self.acceptance_criteria:
             if not self.description or self.acceptance_criteria not in self.description:
-                sections.append(f"\n### Acceptance Criteria\n{self.acceptance_criteria}")
+                ac_block = f"\n\n### Acceptance Criteria\n{self.acceptance_criteria}"
         
         # Parent Epic
+        epic_block = ""
         if self.parent_epic:
-            sections.append(f"\n### Parent Epic")
-            sections.append(f"- {self.parent_epic['key']}: {self.parent_epic['summary']}")
+            epic_block = f"\n\n### Parent Epic\n- {self.parent_epic['key']}: {self.parent_epic['summary']}"
         
         # Linked Issues
+        links_block = ""
         if self.linked_issues:
-            sections.append(f"\n### Linked Issues")
-            for link in self.linked_issues:
-                sections.append(f"- {link['relationship']}: {link['key']} - {link['summary']}")
+            link_lines = "".join(
+                f"\n- {link['relationship']}: {link['key']} - {link['summary']}"
+                for link in self.linked_issues
+            )
+            links_block = f"\n\n### Linked Issues{link_lines}"
         
         # Recent Comments
+        comments_block = ""
         if self.comments:
-            sections.append(f"\n### Recent Comments ({len(self.comments)} total)")
-            for comment in self.comments[-3:]:
-                body = comment['body'][:500] if len(comment['body']) > 500 else comment['body']
-                sections.append(f"\n**{comment['author']}:**\n{body}")
+            comment_entries = "".join(
+                f"\n\n**{comment['author']}:**\n"
+                f"{comment['excerpt']}"
+                for comment in self.comments[-3:]
+            )
+            comments_block = f"\n\n### Recent Comments ({len(self.comments)} total){comment_entries}"
         
-        formatted = "\n".join(sections)
-        return formatted
+        return (
+            f"## JIRA Ticket: {self.ticket_key}\n"
+            f"**Type:** {self.issue_type}\n"
+            f"**Status:** {self.status}\n"
+            f"**Summary:** {self.summary}"
+            f"{labels_block}{description_block}{ac_block}{epic_block}"
+            f"{links_block}{comments_block}"
+        )
 
 
 class JiraCollector:
@@ -82,17 +113,41 @@ class JiraCollector:
         formatted = context.format_for_ai()
     """
     
+    # Issue fields read by the collector. Requesting only these keeps the
+    # payload small and returns comments inline with the issue.
+    _BASE_ISSUE_FIELDS = (
+        "summary", "description", "status", "issuetype",
+        "labels", "comment", "parent", "issuelinks",
+    )
+    
+    # Fallbacks when detection.yaml doesn't configure the JIRA custom fields
+    _DEFAULT_AC_FIELDS = ("customfield_10016", "customfield_10017", "customfield_10020")
+    _DEFAULT_EPIC_LINK_FIELD = "customfield_10014"
+    
     # Class-level cache for JIRA config to avoid reloading config repeatedly
     _jira_config_cache: Optional[dict] = None
     
+    # Keep-alive HTTP session shared by all collectors so TLS connections are reused
+    _shared_session: Optional[requests.Session] = None
+    
+    @classmethod
+    def _get_shared_session(cls) -> requests.Session:
+        """Get the pooled HTTP session used for JIRA requests (created once)."""
+        if cls._shared_session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=10)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            cls._shared_session = session
+        return cls._shared_session
+    
     @classmethod
     def _get_jira_config(cls) -> dict:
         """Get JIRA config from detection.yaml (cached)."""
         if cls._jira_config_cache is None:
             try:
-                from src.context_processor.repo_analyzer import RepoAnalyzer
-                analyzer = RepoAnalyzer()
-                cls._jira_config_cache = analyzer.config.get("jira", {})
+                from src.context_processor.repo_analyzer import load_detection_config
+                cls._jira_config_cache = load_detection_config().get("jira", {})
             except Exception:
                 cls._jira_config_cache = {}
         return cls._jira_config_cache
@@ -106,10 +161,11 @@ class JiraCollector:
         """
         from atlassian import Jira
         
-        self.base_url = os.getenv("JIRA_BASE_URL")
-        self.email = os.getenv("JIRA_EMAIL")
-        self.api_token = os.getenv("JIRA_API_TOKEN")
-        self.timeout = timeout or int(os.getenv("API_TIMEOUT_SECONDS", "30"))
+        env = _env.load()
+        self.base_url = env["JIRA_BASE_URL"]
+        self.email = env["JIRA_EMAIL"]
+        self.api_token = env["JIRA_API_TOKEN"]
+        self.timeout = timeout or env["API_TIMEOUT_SECONDS"]
         
         if not all([self.base_url, self.email, self.api_token]):
             missing = []
@@ -123,7 +179,8 @@ class JiraCollector:
             username=self.email,
             password=self.api_token,
             cloud=True,
-            timeout=self.timeout
+            timeout=self.timeout,
+            session=self._get_shared_session()
         )
     
     @observe(name="jira_collect")
@@ -137,7 +194,7 @@ class JiraCollector:
         Returns:
             JiraContext object with structured ticket information
         """
-        print(f"[JIRA] Fetching ticket: {ticket_key}")
+        log.info("[JIRA] Fetching ticket: %s", ticket_key)
         
         try:
             get_client().update_current_span(
@@ -146,19 +203,35 @@ class JiraCollector:
         except Exception:
             pass
         
-        issue = self.client.issue(ticket_key)
+        # With the cache enabled, a fields=updated probe tells us whether the
+        # ticket changed since the last run before pulling the full payload
+        cache_version = ""
+        if _env.load()["CONTEXT_CACHE_DIR"]:
+            try:
+                probe = self.client.issue(ticket_key, fields="updated")
+                cache_version = (probe.get("fields") or {}).get("updated") or ""
+            except Exception as e:
+                log.warning("  Could not check ticket for changes: %s", e)
+            cached = _cache.get("jira", ticket_key, cache_version)
+            if cached is not None:
+                log.info("  [OK] Ticket unchanged since last run, using cached context")
+                return cached
+        
+        # One request returns the issue, its comments and the inline parent
+        issue = self.client.issue(ticket_key, fields=self._get_issue_fields())
         fields = issue.get("fields", {})
         
-        summary = fields.get("summary", "")
-        description = fields.get("description", "") or ""
-        status = fields.get("status", {}).get("name", "Unknown")
-        issue_type = fields.get("issuetype", {}).get("name", "Unknown")
-        labels = fields.get("labels", [])
+        get = fields.get
+        summary = get("summary", "")
+        description = get("description", "") or ""
+        status = (get("status") or {}).get("name", "Unknown")
+        issue_type = (get("issuetype") or {}).get("name", "Unknown")
+        labels = get("labels", [])
         
         # Extract AC from custom field first, then fall back to description parsing
         # This avoids duplication when AC is in both places
         acceptance_criteria = self._extract_acceptance_criteria(fields, description)
-        comments = self._extract_comments(ticket_key)
+        comments = self._extract_comments(ticket_key, fields)
         parent_epic = self._extract_parent_epic(fields)
         linked_issues = self._extract_linked_issues(fields)
         
@@ -173,8 +246,9 @@ class JiraCollector:
             comments=comments,
             parent_epic=parent_epic,
             linked_issues=linked_issues,
-            raw_response=issue
+            raw_response=issue if _env.load()["JIRA_KEEP_RAW"] else None
         )
+        _cache.put("jira", ticket_key, cache_version, context)
         
         try:
             get_client().update_current_span(
@@ -190,7 +264,8 @@ class JiraCollector:
         except Exception:
             pass
         
-        print(f"  [OK] Collected context for: {summary[:50]}...")
+        if log.isEnabledFor(logging.INFO):
+            log.info("  [OK] Collected context for: %s...", summary[:50])
         return context
     
     def _extract_acceptance_criteria(self, fields: dict, description: str) -> Optional[str]:
@@ -207,11 +282,7 @@ class JiraCollector:
         """
         # Load custom field IDs from cached config (with fallback defaults)
         jira_config = self._get_jira_config()
-        possible_fields = jira_config.get("acceptance_criteria_fields", [
-            "customfield_10016",
-            "customfield_10017", 
-            "customfield_10020",
-        ])
+        possible_fields = jira_config.get("acceptance_criteria_fields", self._DEFAULT_AC_FIELDS)
         
         for field_name in possible_fields:
             value = fields.get(field_name)
@@ -220,32 +291,51 @@ class JiraCollector:
                 return value
         
         # No custom field AC found - try parsing from description
-        if description and "acceptance criteria" in description.lower():
-            lower_desc = description.lower()
-            ac_start = lower_desc.find("acceptance criteria")
-            if ac_start != -1:
-                return description[ac_start:]
+        if description:
+            match = _AC_HEADING_RE.search(description)
+            if match:
+                return description[match.start():]
         
         return None
     
-    def _extract_comments(self, ticket_key: str) -> list[dict]:
-        """Extract comments from a JIRA ticket."""
+    def _get_issue_fields(self) -> str:
+        """Build the comma-separated field list requested with the issue."""
+        jira_config = self._get_jira_config()
+        ac_fields = jira_config.get("acceptance_criteria_fields", self._DEFAULT_AC_FIELDS)
+        epic_link_field = jira_config.get("epic_link_field", self._DEFAULT_EPIC_LINK_FIELD)
+        return ",".join([*self._BASE_ISSUE_FIELDS, *ac_fields, epic_link_field])
+    
+    def _extract_comments(self, ticket_key: str, fields: dict) -> list[dict]:
+        """
+        Extract comments from a JIRA ticket.
+        
+        Uses the comments embedded in the issue response; only falls back to
+        a separate comments request when JIRA returned a truncated page.
+        """
         try:
-            comments_data = self.client.issue_get_comments(ticket_key)
-            comments = comments_data.get("comments", [])
+            comments_data = fields.get("comment") or {}
+            comments = comments_data.get("comments")
+            
+            if comments is None or comments_data.get("total", len(comments)) > len(comments):
+                comments_data = self.client.issue_get_comments(ticket_key)
+                comments = comments_data.get("comments", [])
             
             extracted = []
             for comment in comments:
+                comment_get = comment.get
+                body = comment_get("body") or ""
                 extracted.append({
-                    "author": comment.get("author", {}).get("displayName", "Unknown"),
-                    "created": comment.get("created", ""),
-                    "body": comment.get("body", ""),
+                    "author": (comment_get("author") or {}).get("displayName", "Unknown"),
+                    "created": comment_get("created", ""),
+                    "body": body,
+                    # Truncated once here so formatting only has to interpolate
+                    "excerpt": body[:_MAX_COMMENT_CHARS],
                 })
             
             return extracted
             
         except Exception as e:
-            print(f"  [WARN] Could not fetch comments: {e}")
+            log.warning("  Could not fetch comments: %s", e)
             return []
     
     def _extract_parent_epic(self, fields: dict) -> Optional[dict]:
@@ -254,45 +344,47 @@ class JiraCollector:
         if parent:
             return {
                 "key": parent.get("key"),
-                "summary": parent.get("fields", {}).get("summary", ""),
+                "summary": (parent.get("fields") or {}).get("summary", ""),
             }
         
         # Get epic link field from cached config (with fallback default)
         jira_config = self._get_jira_config()
-        epic_link_field = jira_config.get("epic_link_field", "customfield_10014")
+        epic_link_field = jira_config.get("epic_link_field", self._DEFAULT_EPIC_LINK_FIELD)
         
         epic_link = fields.get(epic_link_field)
         if epic_link:
             try:
-                epic = self.client.issue(epic_link)
+                # Only the summary is needed, so don't pull the whole epic payload
+                epic = self.client.issue(epic_link, fields="summary")
                 return {
                     "key": epic_link,
-                    "summary": epic.get("fields", {}).get("summary", ""),
+                    "summary": (epic.get("fields") or {}).get("summary", ""),
                 }
             except Exception as e:
-                print(f"  [WARN] Could not fetch epic {epic_link}: {e}")
+                log.warning("  Could not fetch epic %s: %s", epic_link, e)
                 return {"key": epic_link, "summary": ""}
         
         return None
     
     def _extract_linked_issues(self, fields: dict) -> list[dict]:
         """Extract linked issues (blocks, relates to, etc.)."""
-        links = fields.get("issuelinks", [])
+        links = fields.get("issuelinks") or ()
         extracted = []
         
         for link in links:
-            if "inwardIssue" in link:
-                issue = link["inwardIssue"]
-                direction = link.get("type", {}).get("inward", "relates to")
-            elif "outwardIssue" in link:
-                issue = link["outwardIssue"]
-                direction = link.get("type", {}).get("outward", "relates to")
+            link_get = link.get
+            issue = link_get("inwardIssue")
+            if issue is not None:
+                direction = (link_get("type") or {}).get("inward", "relates to")
             else:
-                continue
+                issue = link_get("outwardIssue")
+                if issue is None:
+                    continue
+                direction = (link_get("type") or {}).get("outward", "relates to")
             
             extracted.append({
                 "key": issue.get("key"),
-                "summary": issue.get("fields", {}).get("summary", ""),
+                "summary": (issue.get("fields") or {}).get("summary", ""),
                 "relationship": direction,
             })
         
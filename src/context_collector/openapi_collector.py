@@ -8,19 +8,149 @@ Supports:
 - Swagger 2.x (JSON and YAML)
 """
 
-import os
+import io
 import json
-from typing import Optional
+import os
+import sys
+import hashlib
+import logging
+from typing import Any, ClassVar, Iterator, Optional
 from pathlib import Path
 from dataclasses import dataclass, field
-from dotenv import load_dotenv
 import yaml
 from langfuse import observe, get_client
 
-load_dotenv()
+from src import _cache, _env
+
+_env.load()
+
+log = logging.getLogger(__name__)
+
+# LibYAML-backed loader is ~10x faster on large specs; fall back to the
+# pure-Python loader when PyYAML was built without LibYAML
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+# orjson (optional) parses and writes spec files several times faster than
+# the stdlib; both helpers work on bytes. YAML yields values JSON has no
+# type for (an unquoted `example: 2024-01-01` is a datetime.date), which
+# are written as their str()
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+
+    def _json_dumps_bytes(obj: Any) -> bytes:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    _json_loads = json.loads
+
+    def _json_dumps_bytes(obj: Any) -> bytes:
+        return json.dumps(obj, default=str).encode("utf-8")
+
+# HTTP methods read from each path item, in the order endpoints are listed
+_METHOD_ORDER = ("get", "post", "put", "patch", "delete", "options", "head")
+_HTTP_METHODS = frozenset(_METHOD_ORDER)
+# Upper-cased method names, shared by every EndpointInfo
+_METHOD_NAMES = {method: sys.intern(method.upper()) for method in _METHOD_ORDER}
+
+
+def _intern(value: Any) -> Any:
+    """Intern small enum-like strings (locations, types, status codes); pass anything else through."""
+    return sys.intern(value) if type(value) is str else value
+
+# Characters of the API description and of each schema shown in the AI context
+_MAX_DESCRIPTION_CHARS = 500
+_MAX_SCHEMA_CHARS = 500
+_TRUNCATED_MARKER = "\n... [truncated]"
+
+
+def _cap(text: str, limit: int, suffix: str = "") -> str:
+    """Return text unchanged if it fits in limit characters, else its first limit characters plus suffix."""
+    if len(text) <= limit:
+        return text
+    return text[:limit] + suffix
+
+
+def _resolve_local_refs(spec: dict) -> dict:
+    """
+    Return a copy of the spec with local "#/..." $refs replaced by their targets.
+    
+    Each source node is copied once, so every $ref to the same component
+    resolves to the same object (formatting can then serialize it once).
+    A $ref that points back into a node still being resolved is left as-is
+    to keep the result acyclic and JSON-serializable; unresolvable refs are
+    left as-is too. The input spec is not modified.
+    """
+    copies: dict[int, Any] = {}
+    active: set[int] = set()
+    
+    def lookup(ref: str) -> Any:
+        node: Any = spec
+        for part in ref[2:].split("/"):
+            part = part.replace("~1", "/").replace("~0", "~")
+            try:
+                node = node[int(part)] if isinstance(node, list) else node[part]
+            except (KeyError, IndexError, ValueError, TypeError):
+                return None
+        return node
+    
+    def walk(node: Any) -> Any:
+        if isinstance(node, dict):
+            ref = node.get("$ref")
+            if isinstance(ref, str) and ref.startswith("#/"):
+                target = lookup(ref)
+                if target is None or id(target) in active:
+                    return node
+                return walk(target)
+        elif not isinstance(node, list):
+            return node
+        
+        key = id(node)
+        if key in copies:
+            return copies[key]
+        active.add(key)
+        try:
+            if isinstance(node, dict):
+                result = {k: walk(v) for k, v in node.items()}
+            else:
+                result = [walk(v) for v in node]
+        finally:
+            active.discard(key)
+        copies[key] = result
+        return result
+    
+    return walk(spec)
+
+
+class _CapReached(Exception):
+    """Raised by _CapWriter once its character budget is used up."""
 
 
-@dataclass
+class _CapWriter:
+    """
+    File-like wrapper that forwards at most `cap` characters to `out`.
+    
+    json.dump streams chunks into it, so serialization stops as soon as the
+    budget is exhausted instead of encoding the whole schema first.
+    """
+    
+    def __init__(self, out: io.StringIO, cap: int):
+        self.out = out
+        self.remaining = cap
+    
+    def write(self, chunk: str) -> None:
+        if len(chunk) > self.remaining:
+            self.out.write(chunk[:self.remaining])
+            self.remaining = 0
+            raise _CapReached
+        self.out.write(chunk)
+        self.remaining -= len(chunk)
+
+
+@dataclass(slots=True)
 class EndpointInfo:
     """Information about a single API endpoint."""
     path: str
@@ -34,7 +164,7 @@ class EndpointInfo:
     tags: list[str] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class OpenAPIContext:
     """Structured container for OpenAPI specification."""
     title: str
@@ -44,68 +174,95 @@ class OpenAPIContext:
     spec_version: str  # "openapi" or "swagger"
     endpoints: list[EndpointInfo] = field(default_factory=list)
     schemas: dict = field(default_factory=dict)
-    raw_spec: dict = field(default_factory=dict)
+    # Full parsed spec, only kept when requested (collect_from_dict keep_raw=True)
+    raw_spec: Optional[dict] = field(default=None, repr=False)
+    # Memoized format_for_ai() output; contexts aren't modified after collection
+    _formatted: Optional[str] = field(default=None, init=False, repr=False, compare=False)
 
     def format_for_ai(self) -> str:
         """Format OpenAPI context into a string optimized for AI consumption."""
-        sections = []
+        if self._formatted is None:
+            self._formatted = self._format()
+        return self._formatted
+    
+    def _format(self) -> str:
+        """Build the AI-formatted spec (called once per context)."""
+        out = io.StringIO()
+        write = out.write
+        
+        # Specs reuse the same body objects across many endpoints; key on
+        # identity, which is stable while self holds the objects
+        dumps_cache: dict[int, str] = {}
+        
+        def dumps(obj) -> str:
+            """Serialize obj capped like the schemas below: inlined $refs
+            expand again at every use, so a deep component graph could
+            otherwise grow the prompt without limit."""
+            key = id(obj)
+            text = dumps_cache.get(key)
+            if text is None:
+                buf = io.StringIO()
+                try:
+                    json.dump(obj, _CapWriter(buf, _MAX_SCHEMA_CHARS), indent=2)
+                except _CapReached:
+                    buf.write(_TRUNCATED_MARKER)
+                text = dumps_cache[key] = buf.getvalue()
+            return text
         
         # Header
-        sections.append(f"## API Specification: {self.title}")
-        sections.append(f"**Version:** {self.version}")
-        sections.append(f"**Spec Format:** {self.spec_version.upper()}")
+        write(f"## API Specification: {self.title}")
+        write(f"\n**Version:** {self.version}")
+        write(f"\n**Spec Format:** {self.spec_version.upper()}")
         
         if self.base_url:
-            sections.append(f"**Base URL:** {self.base_url}")
+            write(f"\n**Base URL:** {self.base_url}")
         
         # Description
         if self.description:
-            desc = self.description[:500] if len(self.description) > 500 else self.description
-            sections.append(f"\n### Description\n{desc}")
+            write(f"\n\n### Description\n{_cap(self.description, _MAX_DESCRIPTION_CHARS)}")
         
         # Endpoints
-        sections.append(f"\n### Endpoints ({len(self.endpoints)} total)")
+        write(f"\n\n### Endpoints ({len(self.endpoints)} total)")
         
         for endpoint in self.endpoints:
-            sections.append(f"\n#### {endpoint.method} {endpoint.path}")
+            write(f"\n\n#### {endpoint.method} {endpoint.path}")
             
             if endpoint.summary:
-                sections.append(f"**Summary:** {endpoint.summary}")
+                write(f"\n**Summary:** {endpoint.summary}")
             
             if endpoint.operation_id:
-                sections.append(f"**Operation ID:** {endpoint.operation_id}")
+                write(f"\n**Operation ID:** {endpoint.operation_id}")
             
             # Parameters
             if endpoint.parameters:
-                sections.append("\n**Parameters:**")
+                write("\n\n**Parameters:**")
                 for param in endpoint.parameters:
                     required = " (required)" if param.get("required") else ""
-                    sections.append(f"- `{param['name']}` ({param['in']}, {param['type']}){required}")
+                    write(f"\n- `{param['name']}` ({param['in']}, {param['type']}){required}")
             
-            # Request Body
+            # Request Body (shared bodies are serialized once per call, capped)
             if endpoint.request_body:
-                sections.append("\n**Request Body:**")
-                sections.append(f"```json\n{json.dumps(endpoint.request_body, indent=2)}\n```")
+                write(f"\n\n**Request Body:**\n```json\n{dumps(endpoint.request_body)}\n```")
             
             # Responses
             if endpoint.responses:
-                sections.append("\n**Responses:**")
+                write("\n\n**Responses:**")
                 for status, response in endpoint.responses.items():
                     desc = response.get("description", "")
-                    sections.append(f"- `{status}`: {desc}")
+                    write(f"\n- `{status}`: {desc}")
         
         # Schemas (limited to avoid token explosion)
         if self.schemas:
-            sections.append(f"\n### Data Schemas ({len(self.schemas)} total)")
+            write(f"\n\n### Data Schemas ({len(self.schemas)} total)")
             for name, schema in list(self.schemas.items())[:5]:  # Limit to 5
-                sections.append(f"\n#### {name}")
-                schema_str = json.dumps(schema, indent=2)
-                if len(schema_str) > 500:
-                    schema_str = schema_str[:500] + "\n... [truncated]"
-                sections.append(f"```json\n{schema_str}\n```")
-        
-        formatted = "\n".join(sections)
-        return formatted
+                write(f"\n\n#### {name}\n```json\n")
+                try:
+                    json.dump(schema, _CapWriter(out, _MAX_SCHEMA_CHARS), indent=2)
+                except _CapReached:
+                    write(_TRUNCATED_MARKER)
+                write("\n```")
+        
+        return out.getvalue()
 
 
 class OpenAPICollector:
@@ -120,42 +277,156 @@ class OpenAPICollector:
         formatted = context.format_for_ai()
     """
     
+    # Parsed contexts keyed by absolute path -> ((mtime_ns, size), context),
+    # shared by all collectors in the process
+    _mem_cache: ClassVar[dict[str, tuple[tuple[int, int], OpenAPIContext]]] = {}
+    
     @observe(name="openapi_collect")
-    def collect_from_file(self, file_path: str) -> OpenAPIContext:
+    def collect_from_file(self, file_path: str, use_cache: bool = True) -> OpenAPIContext:
         """
         Collect OpenAPI context from a file.
         
+        Parsed specs are cached in memory and, when CONTEXT_CACHE_DIR is set,
+        on disk. An entry is reused only while the file's mtime and size
+        are unchanged.
+        
         Args:
             file_path: Path to OpenAPI spec (JSON or YAML)
+            use_cache: Reuse a previously parsed context for an unchanged file
             
         Returns:
             OpenAPIContext object with parsed specification
         """
-        print(f"[OpenAPI] Parsing spec: {file_path}")
+        log.info("[OpenAPI] Parsing spec: %s", file_path)
         
         path = Path(file_path)
         
-        if not path.exists():
-            raise FileNotFoundError(f"OpenAPI spec not found: {file_path}")
-        
-        # Read and parse file
-        content = path.read_text()
-        
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            raise FileNotFoundError(f"OpenAPI spec not found: {file_path}") from None
+        
+        cache_key = str(path.resolve())
+        signature = (stat.st_mtime_ns, stat.st_size)
+        disk_version = f"{stat.st_mtime_ns}:{stat.st_size}"
+        
+        if use_cache:
+            entry = self._mem_cache.get(cache_key)
+            if entry is not None and entry[0] == signature:
+                log.info("  [OK] Spec unchanged, using cached parse")
+                return entry[1]
+            
+            cached = _cache.get("openapi", cache_key, disk_version)
+            if cached is not None:
+                log.info("  [OK] Spec unchanged, using cached parse")
+                self._mem_cache[cache_key] = (signature, cached)
+                return cached
+        
+        # Read and parse file (YAML from its JSON copy when the copy was
+        # written from this exact content, else parsed and the copy written
+        # for the next run). Parsers take the bytes directly (no
+        # intermediate str copy); both detect the UTF-8/16 encoding themselves
+        data = path.read_bytes()
         if path.suffix in ['.yaml', '.yml']:
-            spec = yaml.safe_load(content)
+            source_sha256 = hashlib.sha256(data).hexdigest()
+            spec = self._read_json_copy(path, source_sha256)
+            if spec is None:
+                spec = yaml.load(data, Loader=_YamlLoader)
+                self._try_write_json_copy(path, source_sha256, spec)
         else:
-            spec = json.loads(content)
+            spec = _json_loads(data)
+        
+        context = self.collect_from_dict(spec, source=file_path)
+        
+        if use_cache:
+            self._mem_cache[cache_key] = (signature, context)
+            _cache.put("openapi", cache_key, disk_version, context)
+        
+        return context
+    
+    @staticmethod
+    def _json_copy_path(path: Path) -> Path:
+        """Where to_json_cache() writes the JSON copy of a YAML spec."""
+        return path.with_name(f".{path.name}.cache.json")
+    
+    @classmethod
+    def _read_json_copy(cls, path: Path, source_sha256: str) -> Optional[dict]:
+        """
+        Return the spec from to_json_cache()'s copy of a YAML spec.
+        
+        JSON parses several times faster than YAML, so the copy is preferred,
+        but only while the hash stored in it matches the YAML's current
+        content (mtimes follow checkout order, not edits).
+        """
+        try:
+            copy = _json_loads(cls._json_copy_path(path).read_bytes())
+        except (OSError, ValueError):
+            return None
+        if not isinstance(copy, dict) or copy.get("source_sha256") != source_sha256:
+            return None
+        return copy.get("spec")
+    
+    @classmethod
+    def _write_json_copy(cls, path: Path, source_sha256: str, spec: Any) -> Path:
+        """Atomically write the JSON copy of a YAML spec, tagged with the YAML's hash."""
+        json_path = cls._json_copy_path(path)
+        tmp_path = json_path.with_name(f"{json_path.name}.{os.getpid()}.tmp")
+        try:
+            tmp_path.write_bytes(_json_dumps_bytes({
+                "source_sha256": source_sha256,
+                "spec": spec,
+            }))
+            os.replace(tmp_path, json_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        return json_path
+    
+    @classmethod
+    def _try_write_json_copy(cls, path: Path, source_sha256: str, spec: Any) -> None:
+        """Write the JSON copy if possible; a read-only checkout just keeps parsing YAML."""
+        try:
+            cls._write_json_copy(path, source_sha256, spec)
+        except (OSError, TypeError, ValueError) as e:
+            log.debug("Could not write JSON copy of %s: %s", path, e)
+    
+    def to_json_cache(self, file_path: str) -> Path:
+        """
+        Write a JSON copy of a YAML spec so later loads skip the YAML parser.
+        
+        collect_from_file() writes the copy itself after parsing a YAML
+        spec; this writes it ahead of time (e.g. while building an image).
+        The copy is a hidden file next to the spec (.<name>.cache.json),
+        written atomically (temp file + rename). It records the YAML's
+        SHA-256 and is only used while the YAML content still matches, so
+        an authored openapi.json next to the YAML is never picked up.
         
-        return self.collect_from_dict(spec, source=file_path)
+        Args:
+            file_path: Path to the YAML OpenAPI spec
+            
+        Returns:
+            Path of the written JSON file
+        """
+        path = Path(file_path)
+        data = path.read_bytes()
+        spec = yaml.load(data, Loader=_YamlLoader)
+        return self._write_json_copy(path, hashlib.sha256(data).hexdigest(), spec)
     
     @observe(name="openapi_collect")
-    def collect_from_dict(self, spec: dict, source: str = "dict") -> OpenAPIContext:
+    def collect_from_dict(
+        self,
+        spec: dict,
+        source: str = "dict",
+        keep_raw: bool = False
+    ) -> OpenAPIContext:
         """
         Collect OpenAPI context from a dictionary.
         
         Args:
             spec: OpenAPI specification as dictionary
             source: Source identifier for logging
+            keep_raw: Keep the resolved spec on the context as raw_spec
+                (off by default; it roughly doubles the context's memory)
             
         Returns:
             OpenAPIContext object with parsed specification
@@ -170,6 +441,10 @@ class OpenAPICollector:
         # Detect spec version
         spec_version = "openapi" if "openapi" in spec else "swagger"
         
+        # Inline local $refs once so parameters, bodies and responses defined
+        # under components/definitions are visible to the extractors
+        spec = _resolve_local_refs(spec)
+        
         # Extract basic info
         info = spec.get("info", {})
         title = info.get("title", "Unknown API")
@@ -193,7 +468,7 @@ class OpenAPICollector:
             spec_version=spec_version,
             endpoints=endpoints,
             schemas=schemas,
-            raw_spec=spec
+            raw_spec=spec if keep_raw else None
         )
         
         try:
@@ -209,7 +484,7 @@ class OpenAPICollector:
         except Exception:
             pass
         
-        print(f"  [OK] Parsed: {title} v{version} ({len(endpoints)} endpoints)")
+        log.info("  [OK] Parsed: %s v%s (%d endpoints)", title, version, len(endpoints))
         return context
     
     def _extract_base_url(self, spec: dict, spec_version: str) -> Optional[str]:
@@ -228,18 +503,42 @@ class OpenAPICollector:
                 return f"{schemes[0]}://{host}{base_path}"
         return None
     
+    def iter_endpoints(self, spec: dict) -> Iterator[EndpointInfo]:
+        """
+        Yield the spec's endpoints one at a time without building the full context.
+        
+        For consumers that only need a count or a filtered subset of a large
+        spec.
+        
+        Args:
+            spec: OpenAPI specification as dictionary
+        """
+        spec_version = "openapi" if "openapi" in spec else "swagger"
+        return self._iter_endpoints(spec, spec_version)
+    
     def _extract_endpoints(self, spec: dict, spec_version: str) -> list[EndpointInfo]:
         """Extract all endpoints from the spec."""
-        endpoints = []
+        return list(self._iter_endpoints(spec, spec_version))
+    
+    def _iter_endpoints(self, spec: dict, spec_version: str) -> Iterator[EndpointInfo]:
+        """Generate endpoints from the spec's paths, in document order."""
         paths = spec.get("paths", {})
+        # Simplified request bodies by id of the source object, so operations
+        # sharing a requestBody also share one simplified dict
+        simplified_bodies: dict[int, Optional[dict]] = {}
         
         for path, path_item in paths.items():
             # Skip path-level parameters
             if not isinstance(path_item, dict):
                 continue
             
-            for method in ["get", "post", "put", "patch", "delete", "options", "head"]:
-                if method not in path_item:
+            present = _HTTP_METHODS.intersection(path_item)
+            if not present:
+                continue
+            path_params = path_item.get("parameters", [])  # Path-level params
+            
+            for method in _METHOD_ORDER:
+                if method not in present:
                     continue
                 
                 operation = path_item[method]
@@ -247,13 +546,18 @@ class OpenAPICollector:
                 # Extract parameters
                 parameters = self._extract_parameters(
                     operation.get("parameters", []),
-                    path_item.get("parameters", [])  # Path-level params
+                    path_params
                 )
                 
                 # Extract request body (OpenAPI 3.x)
                 request_body = None
                 if spec_version == "openapi" and "requestBody" in operation:
-                    request_body = self._simplify_request_body(operation["requestBody"])
+                    raw_body = operation["requestBody"]
+                    key = id(raw_body)
+                    if key in simplified_bodies:
+                        request_body = simplified_bodies[key]
+                    else:
+                        request_body = simplified_bodies[key] = self._simplify_request_body(raw_body)
                 elif spec_version == "swagger":
                     # Swagger 2.x uses body parameter
                     body_params = [p for p in parameters if p.get("in") == "body"]
@@ -263,9 +567,9 @@ class OpenAPICollector:
                 # Extract responses
                 responses = self._extract_responses(operation.get("responses", {}))
                 
-                endpoint = EndpointInfo(
+                yield EndpointInfo(
                     path=path,
-                    method=method.upper(),
+                    method=_METHOD_NAMES[method],
                     operation_id=operation.get("operationId"),
                     summary=operation.get("summary"),
                     description=operation.get("description"),
@@ -274,10 +578,6 @@ class OpenAPICollector:
                     responses=responses,
                     tags=operation.get("tags", [])
                 )
-                
-                endpoints.append(endpoint)
-        
-        return endpoints
     
     def _extract_parameters(self, operation_params: list, path_params: list) -> list[dict]:
         """Combine and simplify parameters."""
@@ -287,9 +587,9 @@ class OpenAPICollector:
         for param in all_params:
             simplified.append({
                 "name": param.get("name"),
-                "in": param.get("in"),  # path, query, header, cookie
+                "in": _intern(param.get("in")),  # path, query, header, cookie
                 "required": param.get("required", False),
-                "type": self._get_param_type(param),
+                "type": _intern(self._get_param_type(param)),
                 "description": param.get("description")
             })
         
@@ -333,7 +633,7 @@ class OpenAPICollector:
         simplified = {}
         
         for status_code, response in responses.items():
-            simplified[status_code] = {
+            simplified[_intern(status_code)] = {
                 "description": response.get("description", ""),
                 "schema": self._extract_response_schema(response)
             }
@@ -4,14 +4,38 @@ Pactflow Context Collector
 Fetches existing contract information from Pactflow/Pact Broker.
 """
 
-import os
-from typing import Optional
+import io
+import logging
+from typing import Any, Optional
 from dataclasses import dataclass, field
-from dotenv import load_dotenv
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from langfuse import observe, get_client
 
-load_dotenv()
+from src import _env
+
+_env.load()
+
+log = logging.getLogger(__name__)
+
+# Verification statuses listed in the AI context, in display order
+_STATUS_HEADINGS = (("verified", "Verified"), ("failed", "Failed"), ("unverified", "Unverified"))
+
+
+def _dig(data: Any, *path: str, default: Any = None) -> Any:
+    """
+    Walk nested HAL dicts along path, returning default as soon as a key is missing.
+    
+    Avoids the throwaway {} of chained .get(key, {}) lookups.
+    """
+    for key in path:
+        if not isinstance(data, dict):
+            return default
+        data = data.get(key)
+        if data is None:
+            return default
+    return data
 
 
 @dataclass
@@ -24,57 +48,59 @@ class ContractInfo:
     verification_status: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class PactflowContext:
     """Structured container for Pactflow information."""
     broker_url: str
     pacticipants: list[dict] = field(default_factory=list)
     contracts: list[ContractInfo] = field(default_factory=list)
+    # Memoized format_for_ai() output; contexts aren't modified after collection
+    _formatted: Optional[str] = field(default=None, init=False, repr=False, compare=False)
 
     def format_for_ai(self) -> str:
         """Format Pactflow context into a string optimized for AI consumption."""
-        sections = []
+        if self._formatted is None:
+            self._formatted = self._format()
+        return self._formatted
+    
+    def _format(self) -> str:
+        """Build the AI-formatted contract summary (called once per context)."""
+        out = io.StringIO()
+        write = out.write
         
         # Header
-        sections.append(f"## Pactflow Contract Information")
-        sections.append(f"**Broker URL:** {self.broker_url}")
+        write("## Pactflow Contract Information")
+        write(f"\n**Broker URL:** {self.broker_url}")
         
         # Pacticipants (services)
         if self.pacticipants:
-            sections.append(f"\n### Registered Services ({len(self.pacticipants)})")
+            write(f"\n\n### Registered Services ({len(self.pacticipants)})")
             for p in self.pacticipants:
                 version_info = f" (v{p['latest_version']})" if p.get('latest_version') else ""
-                sections.append(f"- {p['name']}{version_info}")
+                write(f"\n- {p['name']}{version_info}")
         
         # Existing contracts
         if self.contracts:
-            sections.append(f"\n### Existing Contracts ({len(self.contracts)})")
-            
-            # Group by verification status
-            verified = [c for c in self.contracts if c.verification_status == "verified"]
-            failed = [c for c in self.contracts if c.verification_status == "failed"]
-            unverified = [c for c in self.contracts if c.verification_status == "unverified"]
+            write(f"\n\n### Existing Contracts ({len(self.contracts)})")
             
-            if verified:
-                sections.append("\n**Verified:**")
-                for c in verified:
-                    sections.append(f"- {c.consumer} -> {c.provider} (v{c.version})")
+            # Group by verification status in one pass; contracts with any
+            # other status are not listed
+            buckets = {"verified": [], "failed": [], "unverified": []}
+            for c in self.contracts:
+                bucket = buckets.get(c.verification_status)
+                if bucket is not None:
+                    bucket.append(c)
             
-            if failed:
-                sections.append("\n**Failed:**")
-                for c in failed:
-                    sections.append(f"- {c.consumer} -> {c.provider} (v{c.version})")
-            
-            if unverified:
-                sections.append("\n**Unverified:**")
-                for c in unverified:
-                    sections.append(f"- {c.consumer} -> {c.provider} (v{c.version})")
+            for status, heading in _STATUS_HEADINGS:
+                group = buckets[status]
+                if group:
+                    write(f"\n\n**{heading}:**")
+                    for c in group:
+                        write(f"\n- {c.consumer} -> {c.provider} (v{c.version})")
         else:
-            sections.append("\n### Existing Contracts")
-            sections.append("No contracts found.")
+            write("\n\n### Existing Contracts\nNo contracts found.")
         
-        formatted = "\n".join(sections)
-        return formatted
+        return out.getvalue()
 
 
 class PactflowCollector:
@@ -89,9 +115,10 @@ class PactflowCollector:
     
     def __init__(self):
         """Initialize Pactflow client with credentials from environment."""
-        self.base_url = os.getenv("PACTFLOW_BASE_URL")
-        self.token = os.getenv("PACTFLOW_TOKEN")
-        self.timeout = int(os.getenv("API_TIMEOUT_SECONDS", "30"))
+        env = _env.load()
+        self.base_url = env["PACTFLOW_BASE_URL"]
+        self.token = env["PACTFLOW_TOKEN"]
+        self.timeout = env["API_TIMEOUT_SECONDS"]
         
         if not all([self.base_url, self.token]):
             missing = []
@@ -103,6 +130,21 @@ class PactflowCollector:
             "Authorization": f"Bearer {self.token}",
             "Accept": "application/hal+json"
         }
+        
+        # Keep-alive session so every broker call reuses pooled TLS connections
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=4,
+            max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=[502, 503, 504])
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        
+        # Last response body per URL with its ETag, so repeat requests can be
+        # answered with 304 Not Modified instead of a full download and parse
+        self._etag_cache: dict[str, tuple[str, Any]] = {}
     
     @observe(name="pactflow_collect")
     def collect(
@@ -120,7 +162,7 @@ class PactflowCollector:
         Returns:
             PactflowContext object with contract information
         """
-        print(f"[Pactflow] Fetching contract data...")
+        log.info("[Pactflow] Fetching contract data...")
         
         try:
             get_client().update_current_span(
@@ -156,65 +198,72 @@ class PactflowCollector:
         except Exception:
             pass
         
-        print(f"  [OK] Found {len(pacticipants)} services, {len(contracts)} contracts")
+        log.info("  [OK] Found %d services, %d contracts", len(pacticipants), len(contracts))
         return context
     
+    def _cached_get(self, url: str) -> Any:
+        """
+        GET a broker URL as JSON, revalidating earlier responses by ETag.
+        
+        Args:
+            url: Full broker URL
+            
+        Returns:
+            Parsed JSON body (the cached one on 304), or None on 404
+        """
+        etag, cached = self._etag_cache.get(url, (None, None))
+        headers = {"If-None-Match": etag} if etag else {}
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        
+        if response.status_code == 304:
+            return cached
+        if response.status_code == 404:
+            return None
+        
+        response.raise_for_status()
+        data = response.json()
+        
+        etag = response.headers.get("ETag")
+        if etag:
+            self._etag_cache[url] = (etag, data)
+        return data
+    
     def _get_pacticipants(self) -> list[dict]:
         """Get all pacticipants (services) in the broker."""
         try:
-            response = requests.get(
-                f"{self.base_url}/pacticipants",
-                headers=self.headers,
-                timeout=self.timeout
-            )
-            response.raise_for_status()
-            
-            data = response.json()
-            pacticipants = data.get("_embedded", {}).get("pacticipants", [])
+            data = self._cached_get(f"{self.base_url}/pacticipants")
+            pacticipants = _dig(data, "_embedded", "pacticipants", default=[])
             
             return [
                 {
                     "name": p.get("name"),
                     "display_name": p.get("displayName"),
-                    "latest_version": p.get("_embedded", {}).get("latestVersion", {}).get("number")
+                    "latest_version": _dig(p, "_embedded", "latestVersion", "number")
                 }
                 for p in pacticipants
             ]
         except Exception as e:
-            print(f"  [WARN] Could not fetch pacticipants: {e}")
+            log.warning("  Could not fetch pacticipants: %s", e)
             return []
     
-    def _get_all_contracts(self, pacticipants: list[dict]) -> list[ContractInfo]:
+    def _get_all_contracts(self, pacticipants: Optional[list[dict]] = None) -> list[ContractInfo]:
         """Get all contracts using the /pacts/latest endpoint."""
         contracts = []
         
         try:
-            response = requests.get(
-                f"{self.base_url}/pacts/latest",
-                headers=self.headers,
-                timeout=self.timeout
-            )
-            
-            if response.status_code == 404:
+            data = self._cached_get(f"{self.base_url}/pacts/latest")
+            if data is None:
                 return []
             
-            response.raise_for_status()
-            data = response.json()
-            
             # Get pacts from response
             pacts = data.get("pacts", [])
             
             for pact in pacts:
-                embedded = pact.get("_embedded", {})
-                consumer_info = embedded.get("consumer", {})
-                provider_info = embedded.get("provider", {})
-                
-                consumer_name = consumer_info.get("name", "")
-                provider_name = provider_info.get("name", "")
+                consumer_name = _dig(pact, "_embedded", "consumer", "name", default="")
+                provider_name = _dig(pact, "_embedded", "provider", "name", default="")
                 
                 # Get version info
-                version_info = consumer_info.get("_embedded", {}).get("version", {})
-                version = version_info.get("number", "unknown")
+                version = _dig(pact, "_embedded", "consumer", "_embedded", "version", "number", default="unknown")
                 
                 created_at = pact.get("createdAt")
                 
@@ -228,7 +277,7 @@ class PactflowCollector:
                     ))
                     
         except Exception as e:
-            print(f"  [WARN] Could not fetch contracts: {e}")
+            log.warning("  Could not fetch contracts: %s", e)
         
         return contracts
     
@@ -237,27 +286,18 @@ class PactflowCollector:
         contracts = []
         
         try:
-            response = requests.get(
-                f"{self.base_url}/pacts/provider/{provider}/latest",
-                headers=self.headers,
-                timeout=self.timeout
-            )
-            
-            if response.status_code == 404:
+            data = self._cached_get(f"{self.base_url}/pacts/provider/{provider}/latest")
+            if data is None:
                 return []
             
-            response.raise_for_status()
-            data = response.json()
-            
             # Get pacts from response
-            pacts = data.get("_embedded", {}).get("pacts", [])
+            pacts = _dig(data, "_embedded", "pacts", default=[])
             
             for pact in pacts:
-                consumer_name = pact.get("_embedded", {}).get("consumer", {}).get("name", "")
+                consumer_name = _dig(pact, "_embedded", "consumer", "name", default="")
                 
                 # Get version info
-                version_info = pact.get("_embedded", {}).get("consumer", {}).get("_embedded", {}).get("version", {})
-                version = version_info.get("number", "unknown")
+                version = _dig(pact, "_embedded", "consumer", "_embedded", "version", "number", default="unknown")
                 
                 # Get verification status
                 verification_status = self._get_verification_status(pact)
@@ -271,37 +311,29 @@ class PactflowCollector:
                     ))
                     
         except Exception as e:
-            print(f"  [WARN] Could not fetch contracts for provider {provider}: {e}")
+            log.warning("  Could not fetch contracts for provider %s: %s", provider, e)
         
         return contracts
     
     def _get_consumer_contracts(self, consumer: str) -> list[ContractInfo]:
-        """Get all contracts where this service is the consumer."""
-        contracts = []
-        
-        # We need to check all providers to find ones that have this consumer
-        pacticipants = self._get_pacticipants()
-        
-        for pacticipant in pacticipants:
-            provider_name = pacticipant.get("name")
-            if not provider_name or provider_name == consumer:
-                continue
-            
-            provider_contracts = self._get_provider_contracts(provider_name)
-            
-            for contract in provider_contracts:
-                if contract.consumer == consumer:
-                    contracts.append(contract)
+        """
+        Get all contracts where this service is the consumer.
         
-        return contracts
+        /pacts/latest already lists the latest pact for every consumer/provider
+        pair, so one request filtered locally replaces a lookup per provider.
+        """
+        return [
+            contract for contract in self._get_all_contracts()
+            if contract.consumer == consumer and contract.provider != consumer
+        ]
     
     def _get_verification_status(self, pact: dict) -> str:
         """Extract verification status from pact data."""
         # Try different paths for verification result
-        verification = pact.get("_embedded", {}).get("latestVerificationResult", {})
+        verification = _dig(pact, "_embedded", "latestVerificationResult")
         
         if not verification:
-            verification = pact.get("latestVerificationResult", {})
+            verification = pact.get("latestVerificationResult")
         
         if not verification:
             return "unverified"
@@ -6,7 +6,7 @@ Modules for processing and aggregating context.
 
 from .aggregator import ContextAggregator, AggregatedContext
 from .compressor import ContextCompressor, CompressedContext
-from .repo_analyzer import RepoAnalyzer, RepoAnalysis, PactLibraryInfo
+from .repo_analyzer import RepoAnalyzer, RepoAnalysis, PactLibraryInfo, load_detection_config
 
 __all__ = [
     "ContextAggregator",
@@ -16,4 +16,5 @@ __all__ = [
     "RepoAnalyzer",
     "RepoAnalysis",
     "PactLibraryInfo",
+    "load_detection_config",
 ]
@@ -18,7 +18,13 @@ JIRA Integration:
 """
 
 import os
-from typing import Optional
+import base64
+import logging
+import fnmatch
+import threading
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Iterator, Literal, Optional
 from dataclasses import dataclass, field
 from dotenv import load_dotenv
 from langfuse import observe, get_client
@@ -29,6 +35,7 @@ from .repo_analyzer import RepoAnalyzer, RepoAnalysis, PactLibraryInfo
 from src.context_collector.github_collector import GitHubCollector, GitHubContext
 from src.context_collector.openapi_collector import OpenAPICollector, OpenAPIContext
 from src.context_collector.pactflow_collector import PactflowCollector, PactflowContext
+from src import _cache, _env
 
 # Conditional import for JIRA - only if credentials are available
 try:
@@ -40,6 +47,85 @@ except ImportError:
 
 load_dotenv()
 
+log = logging.getLogger(__name__)
+
+# LibYAML-backed loader is ~10x faster on large specs; fall back to the
+# pure-Python loader when PyYAML was built without LibYAML
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+# orjson (optional) parses JSON specs several times faster; both accept bytes
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# Steps 2-6 of aggregate() run on one worker each
+_COLLECTOR_WORKERS = 5
+
+# Concurrent spec downloads in step 4; bounded to stay clear of GitHub's
+# secondary rate limits
+_SPEC_WORKERS = 8
+
+# Files collected per ** source-file pattern (e.g. src/main/java/**/Client.java)
+_MAX_GLOB_MATCHES = 5
+
+# Consumer/API source files to collect, by language
+_LANGUAGE_PATTERNS: dict[str, tuple[str, ...]] = {
+    "javascript": ("src/consumer.js", "src/client.js", "src/api.js", "lib/consumer.js", "consumer.js"),
+    "typescript": ("src/consumer.ts", "src/client.ts", "src/api.ts", "lib/consumer.ts", "consumer.ts"),
+    "python": ("src/consumer.py", "src/client.py", "src/api.py", "consumer.py", "client.py"),
+    "java": ("src/main/java/**/Consumer.java", "src/main/java/**/Client.java", "src/main/java/**/ApiClient.java"),
+    "go": ("consumer.go", "client.go", "api.go", "internal/consumer/consumer.go"),
+}
+
+# The same patterns split into exact paths and globs
+_LANG_LITERAL_PATHS: dict[str, tuple[str, ...]] = {
+    language: tuple(p for p in patterns if "*" not in p)
+    for language, patterns in _LANGUAGE_PATTERNS.items()
+}
+_LANG_GLOB_PATTERNS: dict[str, tuple[str, ...]] = {
+    language: tuple(p for p in patterns if "*" in p)
+    for language, patterns in _LANGUAGE_PATTERNS.items()
+}
+
+# Section rules yielded by AggregatedContext._iter_sections
+_HR_EQ = "=" * 70
+_HR_DASH = "-" * 70
+
+
+def _cell(value) -> str:
+    """Render a value for a pipe-delimited row."""
+    return str(value).replace("|", "\\|")
+
+
+def _emit_kv_block(title: str, pairs: list[tuple[str, object]]) -> Iterator[str]:
+    """
+    Yield a labeled block in columnar form: the keys once, then the values.
+    
+    Args:
+        title: Block heading (without the trailing colon)
+        pairs: (key, value) pairs, in column order
+    """
+    yield f"{title}:"
+    yield "|".join(_cell(key) for key, _ in pairs)
+    yield "|".join(_cell(value) for _, value in pairs)
+
+
+def _emit_list(title: str, field_name: str, items: list[str]) -> Iterator[str]:
+    """Yield a list block as a single `[N: field; v1; v2; ...]` line."""
+    yield f"{title}:"
+    yield f"[{len(items)}: {field_name}; " + "; ".join(items) + "]"
+
+
+def _submit(executor: ThreadPoolExecutor, fn: Callable, *args) -> Future:
+    """Submit fn to executor in a copy of the current context, so its
+    Langfuse spans nest under the caller's trace."""
+    return executor.submit(contextvars.copy_context().run, fn, *args)
+
 
 def is_jira_configured() -> bool:
     """Check if JIRA credentials are configured in environment."""
@@ -77,6 +163,14 @@ class AggregatedContext:
     specs_used: list[str] = field(default_factory=list)
     collection_warnings: list[str] = field(default_factory=list)
     
+    # "columnar" writes the header blocks as key rows + value rows (fewer
+    # tokens); "labeled" keeps one "  Key: value" line per field for debugging
+    format_mode: Literal["labeled", "columnar"] = "columnar"
+    
+    # format_for_ai() output, built once; the context is not modified after aggregate()
+    _formatted_cache: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    _formatted_len: Optional[int] = field(default=None, init=False, repr=False, compare=False)
+    
     # Convenience properties (access from repo_analysis)
     @property
     def detected_language(self) -> str:
@@ -105,95 +199,122 @@ class AggregatedContext:
         
         This is the main output that will be sent to Gemini.
         """
-        sections = []
+        if self._formatted_cache is None:
+            self._formatted_cache = "\n".join(self._iter_sections())
+            self._formatted_len = len(self._formatted_cache)
+        return self._formatted_cache
+    
+    @observe(name="context_get_token_estimate")
+    def get_token_estimate(self) -> int:
+        """
+        Estimate the number of tokens in the formatted context.
         
+        Rough estimate: ~4 characters per token for English text.
+        Before the context has been formatted, the length is summed from the
+        sections instead of joining them.
+        """
+        if self._formatted_len is None:
+            return (sum(len(section) + 1 for section in self._iter_sections()) - 1) // 4
+        return self._formatted_len // 4
+    
+    def _iter_sections(self) -> Iterator[str]:
+        """Yield the lines of format_for_ai(), which joins them with newlines."""
         # Header
-        sections.append("=" * 70)
-        sections.append("CONTEXT FOR AI CONTRACT TEST GENERATION")
-        sections.append("=" * 70)
-        sections.append("")
+        yield _HR_EQ
+        yield "CONTEXT FOR AI CONTRACT TEST GENERATION"
+        yield _HR_EQ
+        yield ""
+        
+        columnar = self.format_mode == "columnar"
         
         # Repository info
-        sections.append("REPOSITORY INFORMATION:")
-        sections.append(f"  Repository: {self.repo}")
-        sections.append(f"  PR Number: {self.pr_number}")
-        sections.append(f"  Language: {self.detected_language} ({self.language_confidence} confidence)")
-        sections.append(f"  Test Directory: {self.test_directory}")
-        sections.append("")
+        if columnar:
+            yield from _emit_kv_block("REPOSITORY INFORMATION", [
+                ("Repository", self.repo),
+                ("PR Number", self.pr_number),
+                ("Language", self.detected_language),
+                ("Confidence", self.language_confidence),
+                ("Test Directory", self.test_directory),
+            ])
+        else:
+            yield "REPOSITORY INFORMATION:"
+            yield f"  Repository: {self.repo}"
+            yield f"  PR Number: {self.pr_number}"
+            yield f"  Language: {self.detected_language} ({self.language_confidence} confidence)"
+            yield f"  Test Directory: {self.test_directory}"
+        yield ""
         
         # Pact library info
         if self.pact_library:
-            sections.append("PACT LIBRARY:")
-            sections.append(f"  Package: {self.pact_library.package}")
-            sections.append(f"  Test Framework: {self.pact_library.test_framework}")
-            sections.append(f"  File Extension: {self.pact_library.file_extension}")
-            sections.append("")
-            sections.append("IMPORT STATEMENT TO USE:")
-            sections.append(self.pact_library.import_statement)
-            sections.append("")
-            sections.append("EXAMPLE TEST STRUCTURE:")
-            sections.append(self.pact_library.example_test_structure)
-            sections.append("")
+            if columnar:
+                yield from _emit_kv_block("PACT LIBRARY", [
+                    ("Package", self.pact_library.package),
+                    ("Test Framework", self.pact_library.test_framework),
+                    ("File Extension", self.pact_library.file_extension),
+                ])
+            else:
+                yield "PACT LIBRARY:"
+                yield f"  Package: {self.pact_library.package}"
+                yield f"  Test Framework: {self.pact_library.test_framework}"
+                yield f"  File Extension: {self.pact_library.file_extension}"
+            yield ""
+            yield "IMPORT STATEMENT TO USE:"
+            yield self.pact_library.import_statement
+            yield ""
+            yield "EXAMPLE TEST STRUCTURE:"
+            yield self.pact_library.example_test_structure
+            yield ""
         
         # GitHub PR context
         if self.github_context:
-            sections.append("-" * 70)
-            sections.append(self.github_context.format_for_ai())
-            sections.append("")
+            yield _HR_DASH
+            yield self.github_context.format_for_ai()
+            yield ""
         
         # JIRA ticket context
         if self.jira_context:
-            sections.append("-" * 70)
-            sections.append(self.jira_context.format_for_ai())
-            sections.append("")
+            yield _HR_DASH
+            yield self.jira_context.format_for_ai()
+            yield ""
         elif self.ticket_key:
-            sections.append("-" * 70)
-            sections.append(f"JIRA TICKET: {self.ticket_key}")
-            sections.append("  (Could not fetch ticket details - JIRA not configured or inaccessible)")
-            sections.append("")
+            yield _HR_DASH
+            yield f"JIRA TICKET: {self.ticket_key}"
+            yield "  (Could not fetch ticket details - JIRA not configured or inaccessible)"
+            yield ""
         
         # OpenAPI spec context(s)
         if self.openapi_contexts:
             for openapi_ctx in self.openapi_contexts:
-                sections.append("-" * 70)
-                sections.append(openapi_ctx.format_for_ai())
-                sections.append("")
+                yield _HR_DASH
+                yield openapi_ctx.format_for_ai()
+                yield ""
         else:
-            sections.append("-" * 70)
-            sections.append("OPENAPI SPECIFICATION:")
-            sections.append("  No OpenAPI spec found or applicable for this repository.")
-            sections.append("  Generate tests based on PR changes and JIRA requirements.")
-            sections.append("")
+            yield _HR_DASH
+            yield "OPENAPI SPECIFICATION:"
+            yield "  No OpenAPI spec found or applicable for this repository."
+            yield "  Generate tests based on PR changes and JIRA requirements."
+            yield ""
         
         # Pactflow existing contracts
         if self.pactflow_context:
-            sections.append("-" * 70)
-            sections.append(self.pactflow_context.format_for_ai())
-            sections.append("")
+            yield _HR_DASH
+            yield self.pactflow_context.format_for_ai()
+            yield ""
         
         # Warnings
         if self.collection_warnings:
-            sections.append("-" * 70)
-            sections.append("WARNINGS:")
-            for warning in self.collection_warnings:
-                sections.append(f"  - {warning}")
-            sections.append("")
-        
-        sections.append("=" * 70)
-        sections.append("END OF CONTEXT")
-        sections.append("=" * 70)
-        
-        return "\n".join(sections)
-    
-    @observe(name="context_get_token_estimate")
-    def get_token_estimate(self) -> int:
-        """
-        Estimate the number of tokens in the formatted context.
-        
-        Rough estimate: ~4 characters per token for English text.
-        """
-        formatted = self.format_for_ai()
-        return len(formatted) // 4
+            yield _HR_DASH
+            if columnar:
+                yield from _emit_list("WARNINGS", "warning", self.collection_warnings)
+            else:
+                yield "WARNINGS:"
+                for warning in self.collection_warnings:
+                    yield f"  - {warning}"
+            yield ""
+        
+        yield _HR_EQ
+        yield "END OF CONTEXT"
+        yield _HR_EQ
 
 
 class ContextAggregator:
@@ -229,6 +350,10 @@ class ContextAggregator:
         self.openapi_collector = OpenAPICollector()
         self.pactflow_collector = PactflowCollector()
         
+        # PyGithub Repository handles by "owner/repo"; each get_repo is a GET
+        self._repo_cache: dict = {}
+        self._repo_cache_lock = threading.Lock()
+        
         # Initialize JIRA collector only if configured
         self.jira_collector = None
         self.jira_enabled = is_jira_configured()
@@ -237,12 +362,12 @@ class ContextAggregator:
             try:
                 from src.context_collector.jira_collector import JiraCollector
                 self.jira_collector = JiraCollector()
-                print("[Aggregator] JIRA integration enabled")
+                log.info("[Aggregator] JIRA integration enabled")
             except Exception as e:
-                print(f"[Aggregator] JIRA integration disabled: {e}")
+                log.warning("[Aggregator] JIRA integration disabled: %s", e)
                 self.jira_enabled = False
         else:
-            print("[Aggregator] JIRA integration disabled (credentials not configured)")
+            log.info("[Aggregator] JIRA integration disabled (credentials not configured)")
     
     @observe(name="context_aggregate")
     def aggregate(
@@ -264,11 +389,11 @@ class ContextAggregator:
         Returns:
             AggregatedContext with all collected information
         """
-        print(f"[Aggregator] Starting context aggregation for {repo} PR #{pr_number}")
+        log.info("[Aggregator] Starting context aggregation for %s PR #%s", repo, pr_number)
         warnings = []
         
         # Step 1: Analyze repository
-        print("[Aggregator] Step 1/5: Analyzing repository...")
+        log.info("[Aggregator] Step 1/6: Analyzing repository...")
         repo_analysis = self.repo_analyzer.analyze(repo, pr_number)
         
         # Determine ticket to use
@@ -279,71 +404,28 @@ class ContextAggregator:
         # Remove duplicates while preserving order
         specs_to_use = list(dict.fromkeys(specs_to_use))
         
-        # Step 2: Collect GitHub PR context
-        print("[Aggregator] Step 2/5: Collecting GitHub PR context...")
-        github_context = None
-        try:
-            github_context = self.github_collector.collect(repo, pr_number)
-        except Exception as e:
-            warning = f"Failed to collect GitHub context: {e}"
-            print(f"[Aggregator] Warning: {warning}")
-            warnings.append(warning)
-        
-        # Step 3: Collect JIRA context (if ticket exists AND JIRA is configured)
-        print("[Aggregator] Step 3/5: Collecting JIRA context...")
-        jira_context = None
-        
-        if not self.jira_enabled:
-            print("[Aggregator] Skipping JIRA (not configured)")
-        elif not ticket_key:
-            print("[Aggregator] Skipping JIRA (no ticket found in PR)")
-        else:
-            try:
-                jira_context = self.jira_collector.collect(ticket_key)
-                print(f"[Aggregator] Collected JIRA context for {ticket_key}")
-            except Exception as e:
-                warning = f"Failed to collect JIRA context for {ticket_key}: {e}"
-                print(f"[Aggregator] Warning: {warning}")
-                warnings.append(warning)
-        
-        # Step 4: Collect OpenAPI context(s)
-        print("[Aggregator] Step 4/5: Collecting OpenAPI context...")
-        openapi_contexts = []
-        if specs_to_use:
-            for spec_path in specs_to_use:
-                try:
-                    # We need to fetch the spec content from GitHub
-                    openapi_ctx = self._collect_openapi_from_github(repo, spec_path)
-                    if openapi_ctx:
-                        openapi_contexts.append(openapi_ctx)
-                except Exception as e:
-                    warning = f"Failed to collect OpenAPI context for {spec_path}: {e}"
-                    print(f"[Aggregator] Warning: {warning}")
-                    warnings.append(warning)
-        else:
-            print("[Aggregator] Skipping OpenAPI (no specs found)")
-        
-        # Step 5: Collect Pactflow context
-        print("[Aggregator] Step 5/6: Collecting Pactflow context...")
-        pactflow_context = None
-        try:
-            pactflow_context = self.pactflow_collector.collect()
-        except Exception as e:
-            warning = f"Failed to collect Pactflow context: {e}"
-            print(f"[Aggregator] Warning: {warning}")
-            warnings.append(warning)
-        
-        # Step 6: Collect consumer source files
-        print("[Aggregator] Step 6/6: Collecting consumer source files...")
-        source_files = {}
-        try:
-            # Get the source branch from GitHub context to fetch the latest code
-            source_branch = github_context.source_branch if github_context else None
-            source_files = self._collect_source_files(repo, repo_analysis.detected_language, source_branch)
-        except Exception as e:
-            warning = f"Failed to collect source files: {e}"
-            print(f"[Aggregator] Warning: {warning}")
-            warnings.append(warning)
+        # Steps 2-6 only depend on the repository analysis (step 6 also on
+        # the PR's source branch), so run the collectors concurrently; results
+        # and warnings are still gathered in step order
+        with ThreadPoolExecutor(max_workers=_COLLECTOR_WORKERS) as executor:
+            github_future = _submit(executor, self._collect_github_step, repo, pr_number)
+            jira_future = _submit(executor, self._collect_jira_step, ticket_key)
+            openapi_future = _submit(executor, self._collect_openapi_step, repo, specs_to_use)
+            pactflow_future = _submit(executor, self._collect_pactflow_step)
+            source_future = _submit(
+                executor, self._collect_source_step, repo, repo_analysis.detected_language, github_future
+            )
+            
+            github_context, step_warnings = github_future.result()
+            warnings.extend(step_warnings)
+            jira_context, step_warnings = jira_future.result()
+            warnings.extend(step_warnings)
+            openapi_contexts, step_warnings = openapi_future.result()
+            warnings.extend(step_warnings)
+            pactflow_context, step_warnings = pactflow_future.result()
+            warnings.extend(step_warnings)
+            source_files, step_warnings = source_future.result()
+            warnings.extend(step_warnings)
         
         # Build aggregated context
         aggregated = AggregatedContext(
@@ -378,42 +460,168 @@ class ContextAggregator:
         except Exception:
             pass  # Langfuse logging is best-effort, don't fail the workflow
         
-        print(f"[Aggregator] Aggregation complete. Estimated tokens: {token_estimate}")
+        log.info("[Aggregator] Aggregation complete. Estimated tokens: %d", token_estimate)
         
         return aggregated
     
-    def _collect_openapi_from_github(
+    def _collect_github_step(
+        self,
+        repo: str,
+        pr_number: int
+    ) -> tuple[Optional[GitHubContext], list[str]]:
+        """Step 2: Collect GitHub PR context."""
+        log.info("[Aggregator] Step 2/6: Collecting GitHub PR context...")
+        try:
+            return self.github_collector.collect(repo, pr_number), []
+        except Exception as e:
+            warning = f"Failed to collect GitHub context: {e}"
+            log.warning("[Aggregator] %s", warning)
+            return None, [warning]
+    
+    def _collect_jira_step(self, ticket_key: Optional[str]) -> tuple[Optional["JiraContext"], list[str]]:
+        """Step 3: Collect JIRA context (if ticket exists AND JIRA is configured)."""
+        log.info("[Aggregator] Step 3/6: Collecting JIRA context...")
+        if not self.jira_enabled:
+            log.info("[Aggregator] Skipping JIRA (not configured)")
+            return None, []
+        if not ticket_key:
+            log.info("[Aggregator] Skipping JIRA (no ticket found in PR)")
+            return None, []
+        try:
+            jira_context = self.jira_collector.collect(ticket_key)
+            log.info("[Aggregator] Collected JIRA context for %s", ticket_key)
+            return jira_context, []
+        except Exception as e:
+            warning = f"Failed to collect JIRA context for {ticket_key}: {e}"
+            log.warning("[Aggregator] %s", warning)
+            return None, [warning]
+    
+    def _collect_openapi_step(
         self,
         repo: str,
-        spec_path: str
+        specs_to_use: list[str]
+    ) -> tuple[list[OpenAPIContext], list[str]]:
+        """Step 4: Collect OpenAPI context(s)."""
+        log.info("[Aggregator] Step 4/6: Collecting OpenAPI context...")
+        if not specs_to_use:
+            log.info("[Aggregator] Skipping OpenAPI (no specs found)")
+            return [], []
+        
+        try:
+            gh_repo = self._get_gh_repo(repo)
+        except Exception as e:
+            warnings = [f"Failed to collect OpenAPI context for {spec_path}: {e}" for spec_path in specs_to_use]
+            for warning in warnings:
+                log.warning("[Aggregator] %s", warning)
+            return [], warnings
+        
+        # Pin the specs to the default branch's head commit, so unchanged
+        # commits are served from the on-disk cache (when it is enabled)
+        head_sha = self._get_head_sha(gh_repo) if _env.load()["CONTEXT_CACHE_DIR"] else None
+        
+        # Each spec is a separate fetch + parse, so fetch them concurrently;
+        # results are kept in spec order
+        with ThreadPoolExecutor(max_workers=min(_SPEC_WORKERS, len(specs_to_use))) as executor:
+            futures = [
+                _submit(executor, self._fetch_and_parse_spec, gh_repo, spec_path, head_sha)
+                for spec_path in specs_to_use
+            ]
+            openapi_contexts = [future.result() for future in futures]
+        return [ctx for ctx in openapi_contexts if ctx], []
+    
+    def _collect_pactflow_step(self) -> tuple[Optional[PactflowContext], list[str]]:
+        """Step 5: Collect Pactflow context."""
+        log.info("[Aggregator] Step 5/6: Collecting Pactflow context...")
+        try:
+            return self.pactflow_collector.collect(), []
+        except Exception as e:
+            warning = f"Failed to collect Pactflow context: {e}"
+            log.warning("[Aggregator] %s", warning)
+            return None, [warning]
+    
+    def _collect_source_step(
+        self,
+        repo: str,
+        language: str,
+        github_future: "Future[tuple[Optional[GitHubContext], list[str]]]"
+    ) -> tuple[dict[str, str], list[str]]:
+        """Step 6: Collect consumer source files (from the PR's source branch, once known)."""
+        log.info("[Aggregator] Step 6/6: Collecting consumer source files...")
+        try:
+            # Get the source branch from GitHub context to fetch the latest code
+            github_context, _ = github_future.result()
+            source_branch = github_context.source_branch if github_context else None
+            return self._collect_source_files(repo, language, source_branch), []
+        except Exception as e:
+            warning = f"Failed to collect source files: {e}"
+            log.warning("[Aggregator] %s", warning)
+            return {}, [warning]
+    
+    def _get_gh_repo(self, repo: str):
+        """
+        Get the PyGithub Repository for repo, fetching it only once.
+        
+        Reuses the existing GitHub client from GitHubCollector to avoid
+        duplicate connections.
+        """
+        with self._repo_cache_lock:
+            gh_repo = self._repo_cache.get(repo)
+            if gh_repo is None:
+                gh_repo = self.github_collector.client.get_repo(repo)
+                self._repo_cache[repo] = gh_repo
+        return gh_repo
+    
+    def _get_head_sha(self, gh_repo) -> Optional[str]:
+        """Resolve the default branch's head commit SHA (None if it can't be fetched)."""
+        try:
+            return gh_repo.get_commit(gh_repo.default_branch).sha
+        except Exception as e:
+            log.warning("  Could not resolve %s head: %s", gh_repo.default_branch, e)
+            return None
+    
+    def _fetch_and_parse_spec(
+        self,
+        gh_repo,
+        spec_path: str,
+        head_sha: Optional[str] = None
     ) -> Optional[OpenAPIContext]:
         """
         Fetch OpenAPI spec from GitHub and parse it.
         
         Args:
-            repo: Repository name
+            gh_repo: PyGithub Repository object
             spec_path: Path to spec file in the repository
+            head_sha: Commit to read the spec at; when given, the file is
+                cached on disk under that commit (default branch HEAD otherwise)
             
         Returns:
             OpenAPIContext or None if failed
         """
-        # Reuse the existing GitHub client from GitHubCollector to avoid duplicate connections
-        gh_repo = self.github_collector.client.get_repo(repo)
-        
         try:
-            content = gh_repo.get_contents(spec_path)
-            file_content = content.decoded_content.decode("utf-8")
+            raw = None
+            if head_sha:
+                cache_key = f"{gh_repo.full_name}@{head_sha}:{spec_path}"
+                raw = _cache.get("github_files", cache_key, head_sha)
+                if raw is not None:
+                    log.debug("  [OK] %s unchanged at %.7s, using cached copy", spec_path, head_sha)
+            if raw is None:
+                if head_sha:
+                    raw = gh_repo.get_contents(spec_path, ref=head_sha).decoded_content
+                    _cache.put("github_files", cache_key, head_sha, raw)
+                else:
+                    raw = gh_repo.get_contents(spec_path).decoded_content
             
-            # Parse based on file extension
+            # Parse the raw bytes based on file extension; both parsers
+            # detect the encoding themselves
             if spec_path.endswith((".yaml", ".yml")):
-                spec_dict = yaml.safe_load(file_content)
+                spec_dict = yaml.load(raw, Loader=_YamlLoader)
             else:
-                spec_dict = json.loads(file_content)
+                spec_dict = _json_loads(raw)
             
             return self.openapi_collector.collect_from_dict(spec_dict, source=spec_path)
             
         except Exception as e:
-            print(f"[Aggregator] Error fetching {spec_path}: {e}")
+            log.error("[Aggregator] Error fetching %s: %s", spec_path, e)
             return None
 
     def _collect_source_files(self, repo: str, language: str, branch: Optional[str] = None) -> dict[str, str]:
@@ -429,41 +637,81 @@ class ContextAggregator:
             Dict mapping filename to content
         """
         source_files = {}
-        gh_repo = self.github_collector.client.get_repo(repo)
-        
-        # Define patterns for consumer/API files by language
-        patterns = {
-            "javascript": ["src/consumer.js", "src/client.js", "src/api.js", "lib/consumer.js", "consumer.js"],
-            "typescript": ["src/consumer.ts", "src/client.ts", "src/api.ts", "lib/consumer.ts", "consumer.ts"],
-            "python": ["src/consumer.py", "src/client.py", "src/api.py", "consumer.py", "client.py"],
-            "java": ["src/main/java/**/Consumer.java", "src/main/java/**/Client.java", "src/main/java/**/ApiClient.java"],
-            "go": ["consumer.go", "client.go", "api.go", "internal/consumer/consumer.go"],
-        }
-        
-        files_to_check = patterns.get(language, [])
-        
-        for file_path in files_to_check:
-            try:
-                # Skip glob patterns for now (would need recursive search)
-                if "*" in file_path:
+        gh_repo = self._get_gh_repo(repo)
+        
+        literal_paths = _LANG_LITERAL_PATHS.get(language, ())
+        glob_patterns = _LANG_GLOB_PATTERNS.get(language, ())
+        branch_info = f" (from {branch})" if branch else ""
+        
+        def record(file_path: str, file_content: str) -> None:
+            source_files[file_path] = file_content
+            log.debug("  [OK] Collected %s (%d chars)%s", file_path, len(file_content), branch_info)
+        
+        # One recursive tree listing tells us which candidates exist (and
+        # resolves the ** patterns), so only the hits are downloaded
+        blobs = self._list_blobs(gh_repo, branch) if literal_paths or glob_patterns else None
+        if blobs is not None:
+            matches = [p for p in literal_paths if p in blobs]
+            for pattern in glob_patterns:
+                matches.extend(sorted(fnmatch.filter(blobs, pattern))[:_MAX_GLOB_MATCHES])
+            for file_path in matches:
+                if file_path in source_files:
                     continue
-                
-                # Fetch from specific branch if provided
-                if branch:
-                    content = gh_repo.get_contents(file_path, ref=branch)
-                else:
-                    content = gh_repo.get_contents(file_path)
-                    
-                if content and hasattr(content, 'decoded_content'):
-                    file_content = content.decoded_content.decode("utf-8")
-                    source_files[file_path] = file_content
-                    branch_info = f" (from {branch})" if branch else ""
-                    print(f"  [OK] Collected {file_path} ({len(file_content)} chars){branch_info}")
-            except Exception:
-                # File doesn't exist, skip
-                pass
+                try:
+                    # Blob SHAs are content hashes, so a cached copy
+                    # under the same SHA is the same file
+                    blob_sha = blobs[file_path]
+                    cache_key = f"{repo}:{file_path}"
+                    file_content = _cache.get("github_files", cache_key, blob_sha)
+                    if file_content is None:
+                        blob = gh_repo.get_git_blob(blob_sha)
+                        file_content = base64.b64decode(blob.content).decode("utf-8")
+                        _cache.put("github_files", cache_key, blob_sha, file_content)
+                    record(file_path, file_content)
+                except Exception:
+                    # Unreadable or not UTF-8, skip
+                    pass
+        else:
+            # No tree available: probe each literal path (glob patterns
+            # would need a recursive search)
+            for file_path in literal_paths:
+                try:
+                    # Fetch from specific branch if provided
+                    if branch:
+                        content = gh_repo.get_contents(file_path, ref=branch)
+                    else:
+                        content = gh_repo.get_contents(file_path)
+                        
+                    if content and hasattr(content, 'decoded_content'):
+                        record(file_path, content.decoded_content.decode("utf-8"))
+                except Exception:
+                    # File doesn't exist, skip
+                    pass
         
         if not source_files:
-            print("  [WARN] No consumer source files found")
+            log.warning("  No consumer source files found")
         
         return source_files
+    
+    def _list_blobs(self, gh_repo, branch: Optional[str]) -> Optional[dict[str, str]]:
+        """
+        List every file on a branch with one recursive Git Trees call.
+        
+        Args:
+            gh_repo: PyGithub Repository object
+            branch: Branch to list (defaults to the repo's default branch)
+            
+        Returns:
+            Dict mapping file path to blob SHA, or None if the tree could
+            not be fetched or was truncated
+        """
+        try:
+            tree = gh_repo.get_git_tree(branch or gh_repo.default_branch, recursive=True)
+        except Exception as e:
+            log.warning("  Could not fetch repo tree: %s", e)
+            return None
+        
+        if tree.raw_data.get("truncated"):
+            return None
+        
+        return {element.path: element.sha for element in tree.tree if element.type == "blob"}
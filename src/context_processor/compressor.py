@@ -284,7 +284,7 @@ Example Structure:
         if github_ctx.review_comments:
             lines.append(f"\nRecent Comments ({min(len(github_ctx.review_comments), self.max_comments)} shown):")
             for comment in github_ctx.review_comments[:self.max_comments]:
-                lines.append(f"  - {comment.get('author', 'unknown')}: {comment.get('body', '')[:100]}")
+                lines.append(f"  - {comment.author or 'unknown'}: {(comment.body or '')[:100]}")
         
         return "\n".join(lines)
     
@@ -299,7 +299,7 @@ Example Structure:
         }
         
         for file in files:
-            filename = file if isinstance(file, str) else file.get('filename', str(file))
+            filename = file if isinstance(file, str) else file.filename
             
             if any(x in filename.lower() for x in ['openapi', 'swagger', 'api/specs']):
                 categories["api"].append(filename)
@@ -8,19 +8,188 @@ Uses rules defined in config/detection.yaml for all detection logic,
 making it easy to add new languages or patterns without code changes.
 """
 
+import io
 import os
 import re
+import json
+import hashlib
+import logging
+import codecs
 import fnmatch
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
+from urllib.parse import quote
 from typing import Optional
 from dataclasses import dataclass, field
 from dotenv import load_dotenv
 import yaml
-from github import Github
+import requests
+from requests.adapters import HTTPAdapter
 from langfuse import observe, get_client
 
 load_dotenv()
 
+log = logging.getLogger(__name__)
+
+# pyahocorasick (optional) matches many words against a text in one pass
+# (feature names against spec names, content indicators against file heads);
+# below _AHOCORASICK_MIN_FEATURES names the build cost isn't worth it
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+_AHOCORASICK_MIN_FEATURES = 8
+
+# Trailing spec file name parts ignored when matching specs by PR title/branch
+_SPEC_NAME_SUFFIXES = ("-api", "_api", "-spec", "_spec", "-openapi")
+
+# Path parts too generic to name a feature when matching specs by path
+_GENERIC_DIRS = frozenset({
+    "src", "lib", "pkg", "internal", "cmd", "main", "java", "kotlin", "test", "tests"
+})
+
+# LibYAML's C loader parses several times faster; PyYAML without libyaml
+# only ships the pure-Python one
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+# How much of a candidate file is read to check for OpenAPI indicators:
+# the first 500 characters, i.e. at most 2000 UTF-8 bytes
+_SNIFF_CHARS = 500
+_SNIFF_BYTES = _SNIFF_CHARS * 4
+
+# Raw file host; unlike the REST API it honours HTTP Range requests
+_RAW_BASE_URL = "https://raw.githubusercontent.com"
+
+# Changed files of a PR, 100 per page (the REST listing returns 30)
+_GRAPHQL_URL = "https://api.github.com/graphql"
+_PR_FILES_QUERY = """
+query($owner: String!, $name: String!, $number: Int!, $after: String) {
+  repository(owner: $owner, name: $name) {
+    pullRequest(number: $number) {
+      files(first: 100, after: $after) {
+        nodes { path }
+        pageInfo { hasNextPage endCursor }
+      }
+    }
+  }
+}
+"""
+
+# Candidate files sniffed concurrently
+_SNIFF_WORKERS = 10
+
+
+@lru_cache(maxsize=8)
+def _parse_config(path: str, mtime_ns: int, size: int) -> dict:
+    """
+    Parse a detection config file, cached by path and stat signature.
+    
+    mtime_ns and size are part of the cache key so an edited file is
+    re-parsed; the returned dict is shared and must not be mutated.
+    
+    JSON parses much faster than YAML, so a hidden JSON copy is kept next
+    to the file (.detection.yaml.cache.json) for later processes. It
+    records the YAML's SHA-256 and is only used while that still matches
+    the YAML's content (mtimes follow checkout order, not edits).
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    source_sha256 = hashlib.sha256(data).hexdigest()
+    json_path = _config_copy_path(Path(path))
+    
+    try:
+        with open(json_path, "rb") as f:
+            copy = json.load(f)
+        if isinstance(copy, dict) and copy.get("source_sha256") == source_sha256:
+            return copy["config"]
+    except (OSError, ValueError, KeyError):
+        pass
+    
+    if _YamlLoader is yaml.SafeLoader:
+        _note_pure_python_yaml()
+    config = yaml.load(data, Loader=_YamlLoader)
+    _write_config_copy(json_path, source_sha256, config)
+    return config
+
+
+@lru_cache(maxsize=1)
+def _note_pure_python_yaml() -> None:
+    """Say once per process that LibYAML is missing, so ops know to install it."""
+    # Logged on first parse rather than at import, when the CLI has
+    # configured logging
+    log.info("LibYAML not available, using the pure-Python YAML loader (install libyaml for faster parsing)")
+
+
+def _config_copy_path(path: Path) -> Path:
+    """Where _parse_config() keeps the JSON copy of a config file."""
+    return path.with_name(f".{path.name}.cache.json")
+
+
+def _write_config_copy(json_path: Path, source_sha256: str, config: dict) -> None:
+    """
+    Atomically write the JSON copy of a parsed config.
+    
+    Skipped when JSON can't represent the config exactly (e.g. non-string
+    keys would come back as strings), and quietly on read-only checkouts.
+    """
+    try:
+        text = json.dumps({"source_sha256": source_sha256, "config": config})
+    except (TypeError, ValueError):
+        return
+    if json.loads(text)["config"] != config:
+        return
+    tmp_path = json_path.with_name(f"{json_path.name}.{os.getpid()}.tmp")
+    try:
+        tmp_path.write_text(text)
+        os.replace(tmp_path, json_path)
+    except OSError as e:
+        tmp_path.unlink(missing_ok=True)
+        log.debug("Could not write JSON copy of the detection config: %s", e)
+
+
+def load_detection_config(config_path: Optional[str | Path] = None) -> dict:
+    """
+    Load the detection config without building a RepoAnalyzer.
+    
+    Args:
+        config_path: Path to detection.yaml. If None, uses config/detection.yaml
+            at the repository root.
+    
+    Returns:
+        The parsed config; shared between callers, so don't mutate it.
+    """
+    if config_path is None:
+        # Path: src/context_processor/repo_analyzer.py -> ../../config/detection.yaml
+        config_path = Path(__file__).parent.parent.parent / "config" / "detection.yaml"
+    config_path = Path(config_path)
+    
+    if not config_path.exists():
+        raise FileNotFoundError(
+            f"Detection config not found: {config_path}\n"
+            "Please ensure config/detection.yaml exists."
+        )
+    
+    stat = config_path.stat()
+    return _parse_config(str(config_path.resolve()), stat.st_mtime_ns, stat.st_size)
+
+
+def _decode_prefix(data: bytes) -> str:
+    """Decode the first _SNIFF_CHARS characters of a possibly cut-off UTF-8 prefix."""
+    # The incremental decoder holds back a multi-byte character split at the
+    # end instead of failing on it; invalid UTF-8 still raises
+    return codecs.getincrementaldecoder("utf-8")().decode(data)[:_SNIFF_CHARS]
+
+
+def _compile_globs(patterns: list[str]) -> re.Pattern:
+    """Combine shell-style patterns into one regex that matches if any of them does."""
+    # An empty list must match nothing, like any() over no patterns
+    return re.compile("|".join(fnmatch.translate(p) for p in patterns) or "(?!)")
+
 
 @dataclass
 class PactLibraryInfo:
@@ -57,60 +226,47 @@ class RepoAnalysis:
     
     def format_for_ai(self) -> str:
         """Format analysis results for AI consumption."""
-        lines = [
-            "=== REPOSITORY ANALYSIS ===",
-            "",
-            "LANGUAGE:",
-            f"  Detected: {self.detected_language}",
-            f"  Confidence: {self.language_confidence}",
-        ]
+        out = io.StringIO()
+        write = out.write
+        
+        write("=== REPOSITORY ANALYSIS ===\n")
+        write("\nLANGUAGE:")
+        write(f"\n  Detected: {self.detected_language}")
+        write(f"\n  Confidence: {self.language_confidence}")
         
         if self.pact_library:
-            lines.extend([
-                "",
-                "PACT LIBRARY:",
-                f"  Package: {self.pact_library.package}",
-                f"  Test Framework: {self.pact_library.test_framework}",
-                f"  File Extension: {self.pact_library.file_extension}",
-                "",
-                "IMPORT STATEMENT:",
-                self.pact_library.import_statement,
-            ])
-        
-        lines.extend([
-            "",
-            "OPENAPI SPECS:",
-            f"  Total Found: {len(self.all_specs_found)}",
-            f"  Relevant to PR: {len(self.relevant_specs)}",
-            f"  Match Strategy: {self.spec_match_strategy}",
-        ])
+            write("\n\nPACT LIBRARY:")
+            write(f"\n  Package: {self.pact_library.package}")
+            write(f"\n  Test Framework: {self.pact_library.test_framework}")
+            write(f"\n  File Extension: {self.pact_library.file_extension}")
+            write("\n\nIMPORT STATEMENT:\n")
+            write(self.pact_library.import_statement)
+        
+        write("\n\nOPENAPI SPECS:")
+        write(f"\n  Total Found: {len(self.all_specs_found)}")
+        write(f"\n  Relevant to PR: {len(self.relevant_specs)}")
+        write(f"\n  Match Strategy: {self.spec_match_strategy}")
         
         if self.relevant_specs:
-            lines.append("  Relevant Specs:")
+            write("\n  Relevant Specs:")
             for spec in self.relevant_specs:
-                lines.append(f"    - {spec}")
+                write(f"\n    - {spec}")
         
         if self.common_specs:
-            lines.append("  Common/Shared Specs (always included):")
+            write("\n  Common/Shared Specs (always included):")
             for spec in self.common_specs:
-                lines.append(f"    - {spec}")
+                write(f"\n    - {spec}")
         
         if self.ticket_key:
-            lines.extend([
-                "",
-                "JIRA TICKET:",
-                f"  Key: {self.ticket_key}",
-                f"  Source: {self.ticket_source}",
-            ])
+            write("\n\nJIRA TICKET:")
+            write(f"\n  Key: {self.ticket_key}")
+            write(f"\n  Source: {self.ticket_source}")
         
-        lines.extend([
-            "",
-            "TEST OUTPUT:",
-            f"  Directory: {self.test_directory}",
-            f"  File Naming: {self.test_file_naming}",
-        ])
+        write("\n\nTEST OUTPUT:")
+        write(f"\n  Directory: {self.test_directory}")
+        write(f"\n  File Naming: {self.test_file_naming}")
         
-        return "\n".join(lines)
+        return out.getvalue()
 
 
 class RepoAnalyzer:
@@ -137,27 +293,67 @@ class RepoAnalyzer:
         Args:
             config_path: Path to detection.yaml. If None, uses default location.
         """
-        if config_path is None:
-            # Default: look in root config/ folder
-            # Path: src/context_processor/repo_analyzer.py -> ../../config/detection.yaml
-            this_dir = Path(__file__).parent
-            config_path = this_dir.parent.parent / "config" / "detection.yaml"
-        
         self.config = self._load_config(config_path)
-        self.github = Github(os.getenv("GITHUB_TOKEN"))
-    
-    def _load_config(self, config_path: str | Path) -> dict:
-        """Load detection configuration from YAML file."""
-        config_path = Path(config_path)
         
-        if not config_path.exists():
-            raise FileNotFoundError(
-                f"Detection config not found: {config_path}\n"
-                "Please ensure config/detection.yaml exists."
-            )
+        # Spec file patterns, each list precompiled into a single regex
+        openapi_config = self.config["openapi_detection"]
+        self._spec_include_re = _compile_globs(openapi_config["file_patterns"])
+        self._spec_exclude_re = _compile_globs(openapi_config.get("exclude_patterns", []))
+        self._common_files = frozenset(openapi_config.get("common_files", []))
+        self._content_indicators = tuple(openapi_config.get("content_indicators", []))
+        self._content_prefixes = tuple(i.encode("utf-8") for i in self._content_indicators)
+        
+        # One automaton finds any indicator in a single scan of the content
+        # (an empty indicator can't be added, but matches everything anyway)
+        self._indicator_automaton = None
+        if ahocorasick is not None and self._content_indicators and "" not in self._content_indicators:
+            self._indicator_automaton = ahocorasick.Automaton()
+            for index, indicator in enumerate(self._content_indicators):
+                self._indicator_automaton.add_word(indicator, index)
+            self._indicator_automaton.make_automaton()
+        
+        # Ticket key pattern and placeholder patterns, compiled once
+        ticket_config = self.config["ticket_extraction"]
+        self._ticket_re = re.compile(ticket_config["pattern"])
+        self._placeholder_res = [
+            re.compile(p) for p in ticket_config.get("placeholder_patterns", [])
+        ]
         
-        with open(config_path, "r") as f:
-            return yaml.safe_load(f)
+        # Per-language settings, looked up directly on each analyze()
+        self._pact_libraries = {
+            language: PactLibraryInfo(
+                package=lib_config.get("package", ""),
+                import_statement=lib_config.get("import_statement", ""),
+                test_framework=lib_config.get("test_framework", ""),
+                file_extension=lib_config.get("file_extension", ""),
+                file_naming=lib_config.get("file_naming", ""),
+                example_test_structure=lib_config.get("example_test_structure", "")
+            )
+            for language, lib_config in self.config["language_detection"].get("pact_libraries", {}).items()
+        }
+        test_output = self.config["test_output"]
+        self._test_directories = test_output.get("default_directories", {})
+        self._test_file_namings = test_output.get("naming_conventions", {})
+        
+        # PyGithub is slow to import, so it's only loaded once an analyzer is built
+        from github import Github
+        token = os.getenv("GITHUB_TOKEN")
+        self.github = Github(token)
+        
+        # Content sniffing runs in parallel, so it uses a plain pooled session
+        # rather than PyGithub's requester, which isn't reliably thread-safe
+        self.timeout = int(os.getenv("API_TIMEOUT_SECONDS", "30"))
+        self.session = requests.Session()
+        if token:
+            self.session.headers["Authorization"] = f"Bearer {token}"
+        self.session.mount("https://", HTTPAdapter(pool_maxsize=_SNIFF_WORKERS))
+        
+        # Recursive file listings keyed by repo name, reset per analyze() call
+        self._repo_trees: dict[str, Optional[dict[str, list[str]]]] = {}
+    
+    def _load_config(self, config_path: Optional[str | Path]) -> dict:
+        """Load detection configuration from YAML file."""
+        return load_detection_config(config_path)
     
     @observe(name="repo_analyze")
     def analyze(self, repo: str, pr_number: int) -> RepoAnalysis:
@@ -171,42 +367,50 @@ class RepoAnalyzer:
         Returns:
             RepoAnalysis with all detected information
         """
-        print(f"[RepoAnalyzer] Analyzing {repo} PR #{pr_number}")
+        log.info("[RepoAnalyzer] Analyzing %s PR #%s", repo, pr_number)
+        self._repo_trees.clear()
         
         # Get repository and PR objects
         gh_repo = self.github.get_repo(repo)
         pr = gh_repo.get_pull(pr_number)
         
         # Get list of files changed in PR
-        changed_files = [f.filename for f in pr.get_files()]
-        print(f"[RepoAnalyzer] PR has {len(changed_files)} changed files")
+        changed_files = self._get_changed_files(repo, pr)
+        log.info("[RepoAnalyzer] PR has %d changed files", len(changed_files))
+        
+        # List the repo root once; language detection and the "." spec
+        # search path both need it (each falls back to its own lookup)
+        try:
+            root_files = self._list_directory(gh_repo, ".")
+        except Exception:
+            root_files = None
         
         # Step 1: Detect language
-        language, confidence = self._detect_language(gh_repo)
+        language, confidence = self._detect_language(gh_repo, root_files=root_files)
         pact_library = self._get_pact_library(language)
-        print(f"[RepoAnalyzer] Detected language: {language} ({confidence} confidence)")
+        log.info("[RepoAnalyzer] Detected language: %s (%s confidence)", language, confidence)
         
         # Step 2: Find all OpenAPI specs
-        all_specs = self._find_openapi_specs(gh_repo)
-        print(f"[RepoAnalyzer] Found {len(all_specs)} OpenAPI specs")
+        all_specs = self._find_openapi_specs(gh_repo, root_files=root_files)
+        log.info("[RepoAnalyzer] Found %d OpenAPI specs", len(all_specs))
         
         # Step 3: Match specs to PR context
         relevant_specs, match_strategy = self._match_specs_to_pr(
             all_specs, pr, changed_files
         )
-        print(f"[RepoAnalyzer] Matched {len(relevant_specs)} relevant specs using '{match_strategy}'")
+        log.info("[RepoAnalyzer] Matched %d relevant specs using '%s'", len(relevant_specs), match_strategy)
         
         # Step 4: Find common/shared specs
         common_specs = self._find_common_specs(all_specs)
         if common_specs:
-            print(f"[RepoAnalyzer] Found {len(common_specs)} common/shared specs")
+            log.info("[RepoAnalyzer] Found %d common/shared specs", len(common_specs))
         
         # Step 5: Extract JIRA ticket
         ticket_key, ticket_source = self._extract_ticket(pr.title, pr.head.ref)
         if ticket_key:
-            print(f"[RepoAnalyzer] Extracted ticket: {ticket_key} from {ticket_source}")
+            log.info("[RepoAnalyzer] Extracted ticket: %s from %s", ticket_key, ticket_source)
         else:
-            print("[RepoAnalyzer] No JIRA ticket found")
+            log.info("[RepoAnalyzer] No JIRA ticket found")
         
         # Step 6: Get test output configuration
         test_directory = self._get_test_directory(language)
@@ -243,27 +447,81 @@ class RepoAnalyzer:
             test_file_naming=test_file_naming
         )
     
+    def _get_changed_files(self, repo: str, pr) -> list[str]:
+        """
+        List the paths changed in a PR using the GraphQL API.
+        
+        Falls back to PyGithub's paginated REST listing without a token
+        (GraphQL requires authentication) or if the query fails.
+        
+        Args:
+            repo: Repository name (e.g., "owner/repo")
+            pr: PyGithub PullRequest object
+            
+        Returns:
+            List of changed file paths
+        """
+        if "Authorization" not in self.session.headers:
+            return [f.filename for f in pr.get_files()]
+        
+        owner, name = repo.split("/", 1)
+        variables = {"owner": owner, "name": name, "number": pr.number, "after": None}
+        changed_files = []
+        
+        try:
+            while True:
+                response = self.session.post(
+                    _GRAPHQL_URL,
+                    json={"query": _PR_FILES_QUERY, "variables": variables},
+                    timeout=self.timeout
+                )
+                response.raise_for_status()
+                body = response.json()
+                if body.get("errors"):
+                    raise RuntimeError(body["errors"][0].get("message"))
+                
+                page = body["data"]["repository"]["pullRequest"]["files"]
+                changed_files.extend(node["path"] for node in page["nodes"])
+                
+                if not page["pageInfo"]["hasNextPage"]:
+                    return changed_files
+                variables["after"] = page["pageInfo"]["endCursor"]
+        except Exception as e:
+            log.warning("[RepoAnalyzer] GraphQL file listing failed, using REST: %s", e)
+            return [f.filename for f in pr.get_files()]
+    
     @observe(name="detect_language")
-    def _detect_language(self, gh_repo) -> tuple[str, str]:
+    def _detect_language(
+        self,
+        gh_repo,
+        *,
+        root_files: Optional[list[str]] = None
+    ) -> tuple[str, str]:
         """
         Detect repository programming language from package files.
         
+        Args:
+            gh_repo: GitHub repository object
+            root_files: Files in the repo root, if already listed
+        
         Returns:
             Tuple of (language, confidence)
         """
         # Get root directory contents
-        try:
-            contents = gh_repo.get_contents("")
-            root_files = [c.name for c in contents if c.type == "file"]
-        except Exception as e:
-            print(f"[RepoAnalyzer] Warning: Could not list repo contents: {e}")
-            return ("unknown", "low")
+        if root_files is None:
+            try:
+                contents = gh_repo.get_contents("")
+                root_files = [c.name for c in contents if c.type == "file"]
+            except Exception as e:
+                log.warning("[RepoAnalyzer] Could not list repo contents: %s", e)
+                return ("unknown", "low")
         
         # Check each indicator in priority order
         indicators = self.config["language_detection"]["indicators"]
+        root_file_set = set(root_files)
         
         for indicator in indicators:
-            if indicator["file"] in root_files:
+            if indicator["file"] in root_file_set:
                 return (indicator["language"], indicator["confidence"])
         
         # No match found
@@ -271,88 +529,127 @@ class RepoAnalyzer:
     
     def _get_pact_library(self, language: str) -> Optional[PactLibraryInfo]:
         """Get Pact library configuration for detected language."""
-        libraries = self.config["language_detection"].get("pact_libraries", {})
+        return self._pact_libraries.get(language)
+    
+    def _get_repo_tree(self, gh_repo) -> Optional[dict[str, list[str]]]:
+        """
+        List the repository's files with one recursive git tree request.
+        
+        The listing is cached on the analyzer for the current analyze() call.
+        
+        Returns:
+            Dict mapping each directory ("" for the root) to the paths of
+            the files directly inside it, or None if the tree could not be fetched
+            in full (callers then list directories one by one)
+        """
+        key = gh_repo.full_name
+        if key not in self._repo_trees:
+            self._repo_trees[key] = self._fetch_repo_tree(gh_repo)
+        return self._repo_trees[key]
+    
+    def _fetch_repo_tree(self, gh_repo) -> Optional[dict[str, list[str]]]:
+        """Fetch the default branch's recursive tree (see _get_repo_tree)."""
+        try:
+            tree = gh_repo.get_git_tree(gh_repo.default_branch, recursive=True)
+        except Exception as e:
+            log.warning("[RepoAnalyzer] Could not fetch repo tree: %s", e)
+            return None
         
-        if language not in libraries:
+        if tree.raw_data.get("truncated"):
+            log.warning("[RepoAnalyzer] Repo tree is truncated, listing directories instead")
             return None
         
-        lib_config = libraries[language]
-        return PactLibraryInfo(
-            package=lib_config.get("package", ""),
-            import_statement=lib_config.get("import_statement", ""),
-            test_framework=lib_config.get("test_framework", ""),
-            file_extension=lib_config.get("file_extension", ""),
-            file_naming=lib_config.get("file_naming", ""),
-            example_test_structure=lib_config.get("example_test_structure", "")
-        )
+        directories = {}
+        for element in tree.tree:
+            if element.type == "blob":
+                directory = element.path.rpartition("/")[0]
+                directories.setdefault(directory, []).append(element.path)
+        return directories
+    
+    def _list_directory(self, gh_repo, search_path: str) -> list[str]:
+        """
+        List the files directly inside a search path.
+        
+        Returns:
+            List of file paths
+        """
+        tree = self._get_repo_tree(gh_repo)
+        if tree is not None:
+            return tree.get("" if search_path == "." else search_path.strip("/"), [])
+        
+        contents = gh_repo.get_contents("" if search_path == "." else search_path)
+        
+        # Handle single file returned (not a directory)
+        if not isinstance(contents, list):
+            contents = [contents]
+        
+        return [c.path for c in contents if c.type == "file"]
     
     @observe(name="find_openapi_specs")
-    def _find_openapi_specs(self, gh_repo) -> list[str]:
+    def _find_openapi_specs(
+        self,
+        gh_repo,
+        *,
+        root_files: Optional[list[str]] = None
+    ) -> list[str]:
         """
         Find all OpenAPI specification files in the repository.
         
+        Args:
+            gh_repo: GitHub repository object
+            root_files: Files in the repo root, if already listed
+        
         Returns:
             List of file paths to OpenAPI specs
         """
-        specs_found = []
-        openapi_config = self.config["openapi_detection"]
-        search_paths = openapi_config["search_paths"]
-        file_patterns = openapi_config["file_patterns"]
-        exclude_patterns = openapi_config.get("exclude_patterns", [])
+        candidates = []
+        search_paths = self.config["openapi_detection"]["search_paths"]
+        include_re = self._spec_include_re
+        exclude_re = self._spec_exclude_re
         
         for search_path in search_paths:
             try:
-                if search_path == ".":
-                    contents = gh_repo.get_contents("")
+                if search_path == "." and root_files is not None:
+                    files = root_files
                 else:
-                    contents = gh_repo.get_contents(search_path)
-                
-                # Handle single file returned (not a directory)
-                if not isinstance(contents, list):
-                    contents = [contents]
+                    files = self._list_directory(gh_repo, search_path)
                 
-                for content in contents:
-                    if content.type != "file":
-                        continue
-                    
-                    file_name = content.name
-                    file_path = content.path
+                for file_path in files:
+                    file_name = file_path.rpartition("/")[2]
                     
                     # Check if file matches any pattern
-                    matches_pattern = any(
-                        fnmatch.fnmatch(file_name, pattern)
-                        for pattern in file_patterns
-                    )
-                    
-                    if not matches_pattern:
+                    if not include_re.match(file_name):
                         continue
                     
                     # Check if file should be excluded
-                    is_excluded = any(
-                        fnmatch.fnmatch(file_path, pattern) or 
-                        fnmatch.fnmatch(file_name, pattern)
-                        for pattern in exclude_patterns
-                    )
-                    
-                    if is_excluded:
+                    if exclude_re.match(file_path) or exclude_re.match(file_name):
                         continue
                     
-                    # Verify it's actually an OpenAPI spec by checking content
-                    if self._is_openapi_spec(gh_repo, file_path):
-                        specs_found.append(file_path)
+                    candidates.append(file_path)
                         
             except Exception as e:
                 # Directory doesn't exist, skip silently
                 if "404" not in str(e):
-                    print(f"[RepoAnalyzer] Warning: Error searching {search_path}: {e}")
+                    log.warning("[RepoAnalyzer] Error searching %s: %s", search_path, e)
                 continue
         
-        return specs_found
+        # Verify each candidate is actually an OpenAPI spec by checking its
+        # content; the fetches are network-bound, so run them concurrently
+        with ThreadPoolExecutor(max_workers=_SNIFF_WORKERS) as executor:
+            is_spec = list(executor.map(
+                lambda file_path: self._is_openapi_spec(gh_repo, file_path),
+                candidates
+            ))
+        
+        return [file_path for file_path, found in zip(candidates, is_spec) if found]
     
     def _is_openapi_spec(self, gh_repo, file_path: str) -> bool:
         """
         Verify a file is actually an OpenAPI spec by checking its content.
         
+        Only the first bytes of the file are downloaded (HTTP Range request
+        against the raw file), however large the spec is.
+        
         Args:
             gh_repo: GitHub repository object
             file_path: Path to the file
@@ -361,13 +658,32 @@ class RepoAnalyzer:
             True if file contains OpenAPI/Swagger indicators
         """
         try:
-            content = gh_repo.get_contents(file_path)
-            # Only check first 500 chars to avoid downloading huge files
-            file_content = content.decoded_content.decode("utf-8")[:500]
+            url = f"{_RAW_BASE_URL}/{gh_repo.full_name}/{gh_repo.default_branch}/{quote(file_path)}"
+            response = self.session.get(
+                url,
+                headers={"Range": f"bytes=0-{_SNIFF_BYTES - 1}"},
+                timeout=self.timeout
+            )
+            
+            # 416: range not satisfiable (empty file), fetch it whole
+            if response.status_code == 416:
+                response = self.session.get(url, timeout=self.timeout)
             
-            indicators = self.config["openapi_detection"].get("content_indicators", [])
+            response.raise_for_status()
+            # A server that ignores Range answers 200 with the full body
+            head = response.content[:_SNIFF_BYTES]
             
-            for indicator in indicators:
+            # Most specs open with the indicator itself ("openapi: 3.0.0"),
+            # which the raw bytes show without decoding anything
+            if head.startswith(self._content_prefixes):
+                return True
+            
+            file_content = _decode_prefix(head)
+            
+            if self._indicator_automaton is not None:
+                return next(self._indicator_automaton.iter(file_content), None) is not None
+            
+            for indicator in self._content_indicators:
                 if indicator in file_content:
                     return True
             
@@ -400,17 +716,21 @@ class RepoAnalyzer:
             return ([], "no_specs_found")
         
         # Strategy 1: Check if any spec files were changed in the PR
-        changed_specs = [f for f in changed_files if f in all_specs]
+        spec_set = set(all_specs)
+        changed_specs = [f for f in changed_files if f in spec_set]
         if changed_specs:
             return (changed_specs, "changed_spec")
         
+        # Lower-cased spec file names, shared by the name-based strategies
+        spec_stems = [(spec, Path(spec).stem.lower()) for spec in all_specs]
+        
         # Strategy 2: Match changed file paths to spec names
-        matched_specs = self._match_by_path(all_specs, changed_files)
+        matched_specs = self._match_by_path(spec_stems, changed_files)
         if matched_specs:
             return (matched_specs, "path_match")
         
         # Strategy 3: Match PR title or branch name to spec names
-        matched_specs = self._match_by_title_branch(all_specs, pr.title, pr.head.ref)
+        matched_specs = self._match_by_title_branch(spec_stems, pr.title, pr.head.ref)
         if matched_specs:
             return (matched_specs, "title_branch_match")
         
@@ -424,32 +744,53 @@ class RepoAnalyzer:
             # Return first N specs (could be improved with better heuristics)
             return (all_specs[:max_specs], "fallback_limited")
     
-    def _match_by_path(self, specs: list[str], changed_files: list[str]) -> list[str]:
+    def _match_by_path(
+        self,
+        spec_stems: list[tuple[str, str]],
+        changed_files: list[str]
+    ) -> list[str]:
         """
         Match specs by analyzing changed file paths.
         
         Example: If PR changes internal/galleries/handler.go,
         look for a spec containing "galleries" in its name.
+        
+        Args:
+            spec_stems: (spec_path, lower-cased file stem) pairs
+            changed_files: Paths changed in the PR
         """
         matched = set()
         
-        # Extract potential feature names from changed file paths
-        feature_names = set()
-        for file_path in changed_files:
-            parts = file_path.split("/")
-            # Look for meaningful directory names (not generic ones)
-            generic_dirs = {"src", "lib", "pkg", "internal", "cmd", "main", "java", "kotlin", "test", "tests"}
-            for part in parts:
-                if part and part not in generic_dirs and not part.startswith("."):
-                    # Remove file extension if it's the last part
-                    if "." in part:
-                        part = part.rsplit(".", 1)[0]
-                    feature_names.add(part.lower())
-        
-        # Match feature names to spec file names
-        for spec in specs:
-            spec_name = Path(spec).stem.lower()  # e.g., "email-service-api" -> "email-service-api"
+        # Extract potential feature names from changed file paths: every
+        # meaningful path part (not generic or hidden), minus its extension
+        feature_names = {
+            part.rsplit(".", 1)[0].lower()
+            for file_path in changed_files
+            for part in file_path.split("/")
+            if part and part not in _GENERIC_DIRS and not part.startswith(".")
+        }
+        
+        # Match feature names to spec file names. An automaton can't hold the
+        # empty name (from e.g. "file."), which is a substring of everything
+        if (
+            ahocorasick is not None
+            and len(feature_names) >= _AHOCORASICK_MIN_FEATURES
+            and "" not in feature_names
+        ):
+            automaton = ahocorasick.Automaton()
+            for feature in feature_names:
+                automaton.add_word(feature, feature)
+            automaton.make_automaton()
             
+            for spec, spec_name in spec_stems:
+                # Any hit means some feature name appears in the spec name
+                for _ in automaton.iter(spec_name):
+                    matched.add(spec)
+                    break
+            
+            return list(matched)
+        
+        for spec, spec_name in spec_stems:  # e.g., "email-service-api"
             for feature in feature_names:
                 # Check if feature name appears in spec name
                 if feature in spec_name or spec_name.startswith(feature):
@@ -460,7 +801,7 @@ class RepoAnalyzer:
     
     def _match_by_title_branch(
         self,
-        specs: list[str],
+        spec_stems: list[tuple[str, str]],
         pr_title: str,
         branch_name: str
     ) -> list[str]:
@@ -468,17 +809,23 @@ class RepoAnalyzer:
         Match specs by analyzing PR title and branch name.
         
         Example: Branch "feature/galleries-update" might match "galleries-api.yaml"
+        
+        Args:
+            spec_stems: (spec_path, lower-cased file stem) pairs
+            pr_title: PR title
+            branch_name: PR head branch name
         """
         matched = set()
         
         # Combine and normalize title and branch
         search_text = f"{pr_title} {branch_name}".lower()
         
-        for spec in specs:
-            spec_name = Path(spec).stem.lower()
-            # Remove common suffixes to get core name
-            for suffix in ["-api", "_api", "-spec", "_spec", "-openapi"]:
-                spec_name = spec_name.replace(suffix, "")
+        for spec, spec_name in spec_stems:
+            # Remove a common suffix to get core name
+            for suffix in _SPEC_NAME_SUFFIXES:
+                if spec_name.endswith(suffix):
+                    spec_name = spec_name[:-len(suffix)]
+                    break
             
             # Check if spec name appears in title or branch
             if spec_name in search_text:
@@ -492,7 +839,7 @@ class RepoAnalyzer:
         
         These typically contain shared schemas and definitions.
         """
-        common_files = self.config["openapi_detection"].get("common_files", [])
+        common_files = self._common_files
         common_specs = []
         
         for spec in all_specs:
@@ -514,10 +861,7 @@ class RepoAnalyzer:
         Returns:
             Tuple of (ticket_key, source) where source is "pr_title" or "branch_name"
         """
-        ticket_config = self.config["ticket_extraction"]
-        pattern = ticket_config["pattern"]
-        sources = ticket_config.get("sources", ["pr_title", "branch_name"])
-        placeholder_patterns = ticket_config.get("placeholder_patterns", [])
+        sources = self.config["ticket_extraction"].get("sources", ["pr_title", "branch_name"])
         
         # Build lookup for sources
         source_values = {
@@ -528,15 +872,15 @@ class RepoAnalyzer:
         # Check each source in priority order
         for source in sources:
             text = source_values.get(source, "")
-            match = re.search(pattern, text)
+            match = self._ticket_re.search(text)
             
             if match:
                 ticket = match.group(1)
                 
                 # Check if it's a placeholder ticket
                 is_placeholder = any(
-                    re.search(placeholder, ticket)
-                    for placeholder in placeholder_patterns
+                    placeholder.search(ticket)
+                    for placeholder in self._placeholder_res
                 )
                 
                 if not is_placeholder:
@@ -546,11 +890,9 @@ class RepoAnalyzer:
     
     def _get_test_directory(self, language: str) -> str:
         """Get the default test directory for the detected language."""
-        directories = self.config["test_output"].get("default_directories", {})
-        return directories.get(language, "tests/pact")
+        return self._test_directories.get(language, "tests/pact")
     
     def _get_test_file_naming(self, language: str) -> str:
         """Get the test file naming convention for the detected language."""
-        conventions = self.config["test_output"].get("naming_conventions", {})
-        return conventions.get(language, "{consumer}_{provider}_pact_test")
+        return self._test_file_namings.get(language, "{consumer}_{provider}_pact_test")
 
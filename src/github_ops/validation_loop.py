@@ -37,6 +37,7 @@ from typing import Optional, List
 from dataclasses import dataclass, field
 from pathlib import Path
 
+from src import configure_logging
 from src.pipeline import ContractTestPipeline, PipelineResult
 from src.github_ops.test_runner import TestRunner, TestResult
 
@@ -292,6 +293,9 @@ if __name__ == "__main__":
     
     args = parser.parse_args()
     
+    # Collector progress goes through logging; keep it on stdout like the prints
+    configure_logging()
+    
     result = run_validation_loop(
         repo=args.repo,
         pr_number=args.pr,
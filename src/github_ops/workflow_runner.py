@@ -31,6 +31,7 @@ from src.github_ops.test_runner import TestRunner, TestResult
 # Add parent to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
+from src import configure_logging
 from src.pipeline import ContractTestPipeline, PipelineResult
 from src.test_generator.generator import GeneratorConfig
 
@@ -196,6 +197,9 @@ def main():
     
     args = parser.parse_args()
     
+    # Collector progress goes through logging; keep it on stdout like the prints
+    configure_logging()
+    
     try:
         _run_main(args)
     except Exception as e:
@@ -37,6 +37,7 @@ from dotenv import load_dotenv
 from langfuse import observe, get_client
 
 # Our modules
+from src import configure_logging
 from src.context_processor.aggregator import ContextAggregator, AggregatedContext
 from src.context_processor.compressor import ContextCompressor, CompressedContext
 from src.test_generator.generator import (
@@ -230,11 +231,15 @@ class ContractTestPipeline:
             return result
         
         # Step 2: Check if PR has API changes (skip in revision mode)
-        # NOTE: Disabled strict check - let AI decide based on full context
-        # The AI has better understanding of what constitutes API changes
+        # NOTE: No strict check here - the AI decides based on full context
+        # and sets change_type="no_contract_impact" if truly no changes. The
+        # generator's cheaper HTTP-surface pre-filter only runs when
+        # GEMINI_SKIP_NO_HTTP_SURFACE is set
         print("\n[Step 2/5] Checking for API changes...")
-        # Always proceed - AI will set change_type="no_contract_impact" if truly no changes
-        print("  Proceeding with generation (AI will analyze for contract changes)")
+        if self.generator.config.skip_no_http_surface:
+            print("  HTTP-surface pre-filter enabled (PRs without routes or HTTP clients skip generation)")
+        else:
+            print("  Proceeding with generation (AI will analyze for contract changes)")
         
         # Step 3: Compress context
         print("\n[Step 3/5] Compressing context...")
@@ -345,7 +350,7 @@ class ContractTestPipeline:
             return True
 
         changed_files = gh.changed_files or []
-        filenames = [(f.get("filename") or "").lower() for f in changed_files if isinstance(f, dict)]
+        filenames = [(getattr(f, "filename", "") or "").lower() for f in changed_files]
         print("[API Check] changed files (first 30):", filenames[:30])
         
         # If we can't see filenames, don't skip
@@ -439,6 +444,9 @@ def main() -> int:
     
     args = parser.parse_args()
     
+    # Collector progress goes through logging; keep it on stdout like the prints
+    configure_logging()
+    
     # Configure generator (uses GEMINI_MODEL env var if --model not specified)
     config = GeneratorConfig(model=args.model) if args.model else GeneratorConfig.from_env()
     
@@ -326,6 +326,9 @@ def fetch_pact_context(provider_name: str) -> PactContext:
 
 if __name__ == "__main__":
     import sys
+    from src import configure_logging
+    
+    configure_logging()
     
     if len(sys.argv) < 2:
         print("Usage: python -m src.provider.pact_fetcher <provider-name>")
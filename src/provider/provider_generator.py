@@ -624,6 +624,9 @@ def generate_provider_tests(
 
 if __name__ == "__main__":
     import sys
+    from src import configure_logging
+    
+    configure_logging()
     
     if len(sys.argv) < 3:
         print("Usage: python -m src.provider.provider_generator <provider-name> <provider-repo-path>")
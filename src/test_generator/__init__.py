@@ -6,7 +6,7 @@ Modules for generating contract tests using AI.
 
 from .generator import ContractTestGenerator, GenerationResult, GeneratorConfig
 from .output_parser import OutputParser
-from .prompts import SYSTEM_PROMPT, build_user_prompt, build_revision_prompt
+from .prompts import SYSTEM_PROMPT, build_user_prompt, build_user_prompt_parts, build_revision_prompt
 
 __all__ = [
     "ContractTestGenerator",
@@ -15,5 +15,6 @@ __all__ = [
     "OutputParser",
     "SYSTEM_PROMPT",
     "build_user_prompt",
+    "build_user_prompt_parts",
     "build_revision_prompt",
 ]
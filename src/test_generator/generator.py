@@ -16,40 +16,78 @@ Langfuse Integration:
 """
 
 import os
+import re
 import json
-from typing import Optional, TYPE_CHECKING
+import asyncio
+import time
+import random
+import hashlib
+from typing import Iterator, Optional, Union, TYPE_CHECKING
 from dataclasses import dataclass, field
+from functools import cached_property
 from pathlib import Path
 from dotenv import load_dotenv
 
-# Gemini SDK (new google-genai)
-from google import genai
-from google.genai import types
-
 # Langfuse for observability
 from langfuse import observe, get_client
 
 # Our modules
+from src import _cache
 from .prompts import (
     SYSTEM_PROMPT,
     OUTPUT_SCHEMA,
-    build_user_prompt,
+    build_user_prompt_parts,
     build_revision_prompt
 )
 
-# Type checking import to avoid circular dependency
+# Type checking import to avoid circular dependency; the Gemini SDK (new
+# google-genai) is slow to import, so it's only loaded once it's used
 if TYPE_CHECKING:
+    from google.genai import types
     from src.context_processor.repo_analyzer import PactLibraryInfo
     from src.context_processor.compressor import CompressedContext
 
 load_dotenv()
 
+# orjson (optional) decodes the 20-100KB responses several times faster
+try:
+    import orjson
+    
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# Cached Gemini responses (temperature 0 only) are reused for this long
+_RESPONSE_CACHE_TTL_SECONDS = 14 * 24 * 60 * 60
+
+# Transient Gemini API errors (rate limit, overload, timeout) are retried
+# with exponential backoff, or after the server's Retry-After if it sends one
+_RETRYABLE_STATUS_CODES = frozenset({429, 500, 503, 504})
+_MAX_ATTEMPTS = 5
+_MAX_RETRY_DELAY_SECONDS = 30.0
+
+# Token counts remembered per generator by count_tokens()
+_TOKEN_COUNT_CACHE_SIZE = 1024
+
+# Signs of an HTTP surface (routes, handlers, HTTP clients) in a PR; with
+# GeneratorConfig.skip_no_http_surface on, PRs without any are skipped.
+# Unanchored on the left so camelCase names (userClient.ts) match too
+_CONTRACT_HINT = re.compile(
+    r"(?:route|controller|handler|endpoint|api|client|axios|fetch|http|"
+    r"requests?\.|app\.(?:get|post|put|patch|delete)\b|@\w*Mapping)",
+    re.IGNORECASE
+)
+
+# The compressed context's Pact library section; its example test always
+# mentions HTTP calls, so it is left out of the contract hint check
+_PACT_LIBRARY_SECTION = re.compile(r"^=== PACT LIBRARY ===\n.*?(?=\n\n=== |\Z)", re.DOTALL | re.MULTILINE)
+
 
 # =============================================================================
 # DATA CLASSES
 # =============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class GeneratedInteraction:
     """Represents a single Pact interaction."""
     description: str
@@ -63,7 +101,24 @@ class GeneratedInteraction:
     response_body: str = ""    # JSON string
 
 
-@dataclass
+def _build_interaction(interaction_data: dict) -> GeneratedInteraction:
+    """Build a GeneratedInteraction from one element of a test's "interactions" array."""
+    request_data = interaction_data.get("request") or {}
+    response_data = interaction_data.get("response") or {}
+    return GeneratedInteraction(
+        description=interaction_data.get("description", ""),
+        provider_state=interaction_data.get("provider_state", ""),
+        request_method=request_data.get("method", "GET"),
+        request_path=request_data.get("path", "/"),
+        request_headers=request_data.get("headers", ""),
+        request_body=request_data.get("body", ""),
+        response_status=response_data.get("status", 200),
+        response_headers=response_data.get("headers", ""),
+        response_body=response_data.get("body", "")
+    )
+
+
+@dataclass(slots=True)
 class GeneratedTest:
     """Represents a generated Pact test file."""
     filename: str
@@ -79,10 +134,10 @@ class GeneratedTest:
     quality_issues: Optional[list] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class AnalysisResult:
     """Analysis of the PR changes."""
-    change_type: str  # new_endpoint, modification, existing_coverage
+    change_type: str  # new_endpoint, modification, existing_coverage, no_contract_impact
     risk_level: str   # low, medium, high
     affected_endpoints: list[str]
     summary: str
@@ -103,6 +158,87 @@ class GenerationResult:
     def has_tests(self) -> bool:
         """Check if any tests were generated."""
         return len(self.tests) > 0
+    
+    @cached_property
+    def joined_test_code(self) -> str:
+        """All generated test code, joined once for (repeated) revision prompts."""
+        return "\n\n---\n\n".join(t.code for t in self.tests)
+
+
+# =============================================================================
+# STREAMING
+# =============================================================================
+
+class _StreamingResultParser:
+    """
+    Incrementally pick complete pieces out of a streamed response.
+    
+    The response is a JSON object shaped by OUTPUT_SCHEMA. As text is fed
+    in, the "analysis" object and each element of the "tests" array are
+    returned as soon as their closing bracket arrives; everything else is
+    left for the final json decode of the whole text.
+    """
+    
+    def __init__(self):
+        self.text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._string_start = 0
+        self._last_string = ""
+        self._key = None         # Top-level key whose value is being read
+        self._value_start = None  # Start of the object currently captured
+        self._value_depth = 0      # ... and the depth it opened at
+    
+    def feed(self, chunk: str) -> list[tuple[str, dict]]:
+        """
+        Add a chunk of response text.
+        
+        Returns:
+            ("analysis", dict) / ("test", dict) pairs completed by this chunk
+        """
+        self.text += chunk
+        completed = []
+        text = self.text
+        for pos in range(self._pos, len(text)):
+            char = text[pos]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    self._last_string = text[self._string_start:pos]
+                continue
+            
+            if char == '"':
+                self._in_string = True
+                self._string_start = pos + 1
+            elif char == ":" and self._depth == 1:
+                self._key = self._last_string
+            elif char in "{[":
+                self._depth += 1
+                # analysis is {...} at depth 2; each test is {...} at depth 3
+                if char == "{" and (
+                    (self._depth == 2 and self._key == "analysis")
+                    or (self._depth == 3 and self._key == "tests")
+                ):
+                    self._value_start = pos
+                    self._value_depth = self._depth
+            elif char in "}]":
+                self._depth -= 1
+                if self._value_start is not None and self._depth == self._value_depth - 1:
+                    try:
+                        value = json.loads(text[self._value_start:pos + 1])
+                    except json.JSONDecodeError:
+                        value = None
+                    if isinstance(value, dict):
+                        completed.append(("analysis" if self._value_depth == 2 else "test", value))
+                    self._value_start = None
+        self._pos = len(text)
+        return completed
 
 
 # =============================================================================
@@ -116,6 +252,8 @@ class GeneratorConfig:
     model: str = ""  # Required: set GEMINI_MODEL in .env
     temperature: float = 0.2
     max_output_tokens: int = 32768
+    max_concurrency: int = 4  # Gemini calls in flight at once in generate_many()
+    skip_no_http_surface: bool = False  # Skip Gemini for PRs with no sign of an HTTP surface
     
     def __post_init__(self):
         """Load config from environment variables."""
@@ -129,6 +267,10 @@ class GeneratorConfig:
             self.temperature = float(temp)
         if tokens := os.getenv("GEMINI_MAX_TOKENS"):
             self.max_output_tokens = int(tokens)
+        if concurrency := os.getenv("GEMINI_MAX_CONCURRENCY"):
+            self.max_concurrency = int(concurrency)
+        if skip := os.getenv("GEMINI_SKIP_NO_HTTP_SURFACE"):
+            self.skip_no_http_surface = skip.lower() in ("1", "true", "yes")
     
     @classmethod
     def from_env(cls) -> "GeneratorConfig":
@@ -140,7 +282,9 @@ class GeneratorConfig:
         return cls(
             model=model,
             temperature=float(os.getenv("GEMINI_TEMPERATURE", "0.2")),
-            max_output_tokens=int(os.getenv("GEMINI_MAX_TOKENS", "32768"))
+            max_output_tokens=int(os.getenv("GEMINI_MAX_TOKENS", "32768")),
+            max_concurrency=int(os.getenv("GEMINI_MAX_CONCURRENCY", "4")),
+            skip_no_http_surface=os.getenv("GEMINI_SKIP_NO_HTTP_SURFACE", "").lower() in ("1", "true", "yes")
         )
 
 
@@ -180,8 +324,23 @@ class ContractTestGenerator:
         if not api_key:
             raise ValueError("GEMINI_API_KEY environment variable is required")
         
+        from google import genai
+        from google.genai import types
         self.client = genai.Client(api_key=api_key)
         
+        # Generation settings and the system prompt are the same for every
+        # call, so build them once rather than per request
+        self._generation_config = types.GenerateContentConfig(
+            temperature=self.config.temperature,
+            max_output_tokens=self.config.max_output_tokens,
+            response_mime_type="application/json",
+            response_schema=OUTPUT_SCHEMA
+        )
+        self._system_part = types.Part(text=SYSTEM_PROMPT)
+        
+        # count_tokens() results by sha256 of the text
+        self._token_counts: dict[bytes, int] = {}
+        
         print(f"[Generator] Initialized with model: {self.config.model}")
         print(f"[Generator] Temperature: {self.config.temperature}")
     
@@ -210,6 +369,240 @@ class ContractTestGenerator:
         Returns:
             GenerationResult containing analysis and generated tests
         """
+        # PRs with no HTTP surface at all don't need a Gemini call (opt-in)
+        if self._skip_without_contract_hint(compressed_context, revision_feedback, existing_tests):
+            result = self._no_contract_impact_result()
+            self._log_generation_output(result, cache_hit=False)
+            return result
+        
+        user_prompt, context_prompt = self._build_prompts(
+            compressed_context, language, pact_library, file_naming_convention,
+            revision_feedback, existing_tests, repo_name
+        )
+        self._log_generation_input(language, compressed_context, user_prompt, context_prompt)
+        
+        # Reuse a stored response for an identical prompt, else call Gemini
+        cache_key = self._response_cache_key(user_prompt + context_prompt)
+        cached = self._get_cached_response(cache_key)
+        if cached is not None:
+            print("[Generator] Using cached response for identical prompt")
+            result = self._build_result(cached, language, token_usage={})
+        else:
+            response = self._call_gemini(user_prompt, context_prompt)
+            result = self._parse_and_store(response, language, cache_key)
+        
+        self._log_generation_output(result, cache_hit=cached is not None)
+        return result
+    
+    @observe(name="contract_test_generate")
+    async def generate_async(
+        self,
+        compressed_context: "CompressedContext",
+        language: str,
+        pact_library: Optional["PactLibraryInfo"],
+        file_naming_convention: str,
+        revision_feedback: Optional[str] = None,
+        existing_tests: Optional[dict[str, str]] = None,
+        repo_name: str = "unknown"
+    ) -> GenerationResult:
+        """
+        Async variant of generate() using Gemini's async client.
+        
+        Args:
+            compressed_context: CompressedContext object from compressor
+            language: Detected programming language
+            pact_library: PactLibraryInfo object from repo_analyzer (or None)
+            file_naming_convention: Test file naming pattern
+            revision_feedback: Optional feedback from failed test run for retry
+            existing_tests: Dict of existing test files (filename -> content) for revision mode
+            repo_name: Repository name used for consumer naming
+            
+        Returns:
+            GenerationResult containing analysis and generated tests
+        """
+        # PRs with no HTTP surface at all don't need a Gemini call (opt-in)
+        if self._skip_without_contract_hint(compressed_context, revision_feedback, existing_tests):
+            result = self._no_contract_impact_result()
+            self._log_generation_output(result, cache_hit=False)
+            return result
+        
+        user_prompt, context_prompt = self._build_prompts(
+            compressed_context, language, pact_library, file_naming_convention,
+            revision_feedback, existing_tests, repo_name
+        )
+        self._log_generation_input(language, compressed_context, user_prompt, context_prompt)
+        
+        cache_key = self._response_cache_key(user_prompt + context_prompt)
+        cached = self._get_cached_response(cache_key)
+        if cached is not None:
+            print("[Generator] Using cached response for identical prompt")
+            result = self._build_result(cached, language, token_usage={})
+        else:
+            response = await self._call_gemini_async(user_prompt, context_prompt)
+            result = self._parse_and_store(response, language, cache_key)
+        
+        self._log_generation_output(result, cache_hit=cached is not None)
+        return result
+    
+    async def generate_many(self, requests: list[dict]) -> list[GenerationResult]:
+        """
+        Run several generations concurrently.
+        
+        At most config.max_concurrency Gemini calls are in flight at once.
+        
+        Args:
+            requests: Keyword arguments for generate_async(), one dict per generation
+            
+        Returns:
+            GenerationResults in the same order as requests
+        """
+        semaphore = asyncio.Semaphore(self.config.max_concurrency)
+        
+        async def run(kwargs: dict) -> GenerationResult:
+            async with semaphore:
+                return await self.generate_async(**kwargs)
+        
+        return list(await asyncio.gather(*(run(kwargs) for kwargs in requests)))
+    
+    def generate_iter(
+        self,
+        compressed_context: "CompressedContext",
+        language: str,
+        pact_library: Optional["PactLibraryInfo"],
+        file_naming_convention: str,
+        revision_feedback: Optional[str] = None,
+        existing_tests: Optional[dict[str, str]] = None,
+        repo_name: str = "unknown"
+    ) -> Iterator[Union[AnalysisResult, GeneratedTest]]:
+        """
+        Streaming variant of generate().
+        
+        Yields the AnalysisResult as soon as it has been generated, then each
+        GeneratedTest as it completes, instead of waiting for the whole
+        response. The full response is cached like generate() does.
+        
+        Args:
+            compressed_context: CompressedContext object from compressor
+            language: Detected programming language
+            pact_library: PactLibraryInfo object from repo_analyzer (or None)
+            file_naming_convention: Test file naming pattern
+            revision_feedback: Optional feedback from failed test run for retry
+            existing_tests: Dict of existing test files (filename -> content) for revision mode
+            repo_name: Repository name used for consumer naming
+            
+        Yields:
+            AnalysisResult, then GeneratedTest objects
+        """
+        # PRs with no HTTP surface at all don't need a Gemini call (opt-in)
+        if self._skip_without_contract_hint(compressed_context, revision_feedback, existing_tests):
+            result = self._no_contract_impact_result()
+            yield result.analysis
+            return
+        
+        user_prompt, context_prompt = self._build_prompts(
+            compressed_context, language, pact_library, file_naming_convention,
+            revision_feedback, existing_tests, repo_name
+        )
+        
+        cache_key = self._response_cache_key(user_prompt + context_prompt)
+        cached = self._get_cached_response(cache_key)
+        if cached is not None:
+            print("[Generator] Using cached response for identical prompt")
+            result = self._build_result(cached, language, token_usage={})
+            yield result.analysis
+            yield from result.tests
+            return
+        
+        parser = _StreamingResultParser()
+        last_chunk = None
+        for chunk in self._call_gemini_stream(user_prompt, context_prompt):
+            last_chunk = chunk
+            for kind, data in parser.feed(chunk.text or ""):
+                if kind == "analysis":
+                    yield self._build_analysis(data)
+                else:
+                    yield self._build_test(data, language)
+        
+        if last_chunk is not None:
+            self._check_finish_reason(last_chunk)
+            self._token_usage(last_chunk)
+        try:
+            raw_response = _json_loads(parser.text)
+        except json.JSONDecodeError as e:
+            print(f"[Generator] ERROR: Failed to parse JSON response: {e}")
+            return
+        self._put_cached_response(cache_key, raw_response)
+    
+    def _skip_without_contract_hint(
+        self,
+        compressed_context: "CompressedContext",
+        revision_feedback: Optional[str],
+        existing_tests: Optional[dict[str, str]]
+    ) -> bool:
+        """Whether to skip Gemini because the PR shows no HTTP surface.
+        
+        Off unless GeneratorConfig.skip_no_http_surface is set; the pipeline
+        otherwise lets the AI decide. Revisions are never skipped.
+        """
+        if not self.config.skip_no_http_surface or revision_feedback or existing_tests:
+            return False
+        return not self._has_contract_hint(compressed_context)
+    
+    def _has_contract_hint(self, compressed_context: "CompressedContext") -> bool:
+        """
+        Check whether the PR shows any sign of an HTTP surface.
+        
+        Searches the changed file names and the compressed context minus its
+        Pact library section (whose example always mentions HTTP calls).
+        Diffs of files not flagged as API-relevant aren't collected, so
+        those files are judged by name and by the collected source files.
+        Fails open: anything uncertain counts as a hint.
+        """
+        context = compressed_context.original_context
+        text = _PACT_LIBRARY_SECTION.sub("", compressed_context.compressed_text)
+        if context is None:
+            return bool(_CONTRACT_HINT.search(text))
+        
+        gh = context.github_context
+        if context.openapi_contexts or gh is None or not gh.changed_files:
+            return True
+        if any(changed.is_api_relevant for changed in gh.changed_files):
+            return True
+        
+        filenames = "\n".join(changed.filename for changed in gh.changed_files)
+        return bool(_CONTRACT_HINT.search(filenames) or _CONTRACT_HINT.search(text))
+    
+    def _no_contract_impact_result(self) -> GenerationResult:
+        """Result for a PR skipped because it has no HTTP surface."""
+        print("[Generator] No HTTP surface in PR, skipping generation")
+        return GenerationResult(
+            analysis=AnalysisResult(
+                change_type="no_contract_impact",
+                risk_level="low",
+                affected_endpoints=[],
+                summary="No routes, handlers or HTTP client code changed in this PR",
+                recommendation="No contract tests needed"
+            ),
+            tests=[],
+            skip_reason="No HTTP surface detected in diff"
+        )
+    
+    def _build_prompts(
+        self,
+        compressed_context: "CompressedContext",
+        language: str,
+        pact_library: Optional["PactLibraryInfo"],
+        file_naming_convention: str,
+        revision_feedback: Optional[str] = None,
+        existing_tests: Optional[dict[str, str]] = None,
+        repo_name: str = "unknown"
+    ) -> tuple[str, str]:
+        """
+        Build the (instructions, context) user prompt parts for a generation.
+        
+        Returns:
+            Tuple of (user_prompt, context_prompt); see _call_gemini
+        """
         # Convert PactLibraryInfo object to dict for prompt builder
         pact_config = {}
         if pact_library:
@@ -222,8 +615,10 @@ class ContractTestGenerator:
                 "example_test_structure": pact_library.example_test_structure
             }
         
-        # Build the user prompt with compressed context
-        user_prompt = build_user_prompt(
+        # Build the user prompt: the stable instructions are sent first so
+        # Gemini can serve them from its prompt-prefix cache, and everything
+        # PR-specific (context, revision feedback) goes in the second part
+        user_prompt, context_prompt = build_user_prompt_parts(
             language=language,
             pact_config=pact_config,
             compressed_context=compressed_context.compressed_text,
@@ -233,7 +628,7 @@ class ContractTestGenerator:
         
         # Add revision section if this is a revision request with existing tests
         if revision_feedback and existing_tests:
-            user_prompt += f"""
+            context_prompt += f"""
 
 ## REVISION MODE - UPDATE EXISTING TESTS ONLY
 You are revising EXISTING tests, not generating new ones from scratch.
@@ -244,13 +639,13 @@ You are revising EXISTING tests, not generating new ones from scratch.
 ### Existing Tests to Revise:
 """
             for filename, content in existing_tests.items():
-                user_prompt += f"""
+                context_prompt += f"""
 #### {filename}
 ```
 {content}
 ```
 """
-            user_prompt += """
+            context_prompt += """
 ### Instructions:
 1. Apply the developer's requested changes to the relevant tests
 2. Return ONLY the tests that need modification - do not return unchanged tests
@@ -260,7 +655,7 @@ You are revising EXISTING tests, not generating new ones from scratch.
 """
         elif revision_feedback:
             # Fallback for retry after test failure (no existing tests passed)
-            user_prompt += f"""
+            context_prompt += f"""
 
 ## REVISION REQUEST
 The previous test generation failed with the following error. Please fix the issues:
@@ -272,25 +667,29 @@ The previous test generation failed with the following error. Please fix the iss
 Generate corrected tests that address these errors.
 """
         
-        # Log input to Langfuse
+        return user_prompt, context_prompt
+    
+    def _log_generation_input(
+        self,
+        language: str,
+        compressed_context: "CompressedContext",
+        user_prompt: str,
+        context_prompt: str
+    ) -> None:
+        """Log generation input to Langfuse."""
         try:
             get_client().update_current_span(
                 input={
                     "language": language,
                     "compressed_tokens": compressed_context.stats.compressed_tokens,
-                    "prompt_length": len(user_prompt)
+                    "prompt_length": len(user_prompt) + len(context_prompt)
                 }
             )
         except Exception:
             pass  # Langfuse logging is optional
-        
-        # Call Gemini
-        response = self._call_gemini(user_prompt)
-        
-        # Parse the response
-        result = self._parse_response(response, language)
-        
-        # Log output to Langfuse
+    
+    def _log_generation_output(self, result: GenerationResult, cache_hit: bool) -> None:
+        """Log generation output to Langfuse."""
         try:
             get_client().update_current_span(
                 output={
@@ -300,13 +699,12 @@ Generate corrected tests that address these errors.
                 },
                 metadata={
                     "token_usage": result.token_usage,
-                    "model": self.config.model
+                    "model": self.config.model,
+                    "cache_hit": cache_hit
                 }
             )
         except Exception:
             pass
-        
-        return result
     
     @observe(name="contract_test_revise")
     def revise(
@@ -330,7 +728,7 @@ Generate corrected tests that address these errors.
         """
         # Build revision prompt
         revision_prompt = build_revision_prompt(
-            previous_tests=[t.code for t in previous_result.tests],
+            previous_tests=previous_result.joined_test_code,
             feedback=feedback,
             language=language
         )
@@ -352,41 +750,155 @@ Generate corrected tests that address these errors.
         # Parse and return
         return self._parse_response(response, language)
     
-    def _call_gemini(self, user_prompt: str) -> types.GenerateContentResponse:
+    def _response_cache_key(self, user_prompt: str) -> Optional[str]:
+        """
+        Key for caching the response to this prompt.
+        
+        Only deterministic (temperature 0) generations are cached; at any
+        other temperature a fresh sample is expected, so this returns None.
+        """
+        if self.config.temperature != 0:
+            return None
+        material = json.dumps(
+            [self.config.model, self.config.max_output_tokens, SYSTEM_PROMPT, user_prompt]
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+    
+    def _get_cached_response(self, cache_key: Optional[str]) -> Optional[dict]:
+        """Return the stored raw response for cache_key, if present and fresh."""
+        if cache_key is None:
+            return None
+        entry = _cache.get("gemini", cache_key, self.config.model)
+        if entry is None:
+            return None
+        stored_at, raw_response = entry
+        if time.time() - stored_at > _RESPONSE_CACHE_TTL_SECONDS:
+            return None
+        return raw_response
+    
+    def _put_cached_response(self, cache_key: Optional[str], raw_response: dict) -> None:
+        """Store a successfully parsed raw response under cache_key."""
+        if cache_key is None:
+            return
+        _cache.put("gemini", cache_key, self.config.model, (time.time(), raw_response))
+    
+    def _call_gemini(
+        self,
+        user_prompt: str,
+        context_prompt: str = ""
+    ) -> "types.GenerateContentResponse":
         """
         Make the actual Gemini API call.
         
         Args:
-            user_prompt: The user prompt to send
+            user_prompt: The user prompt to send (its stable part, if split)
+            context_prompt: Request-specific part, sent last so the system
+                and user prompts form a cacheable prefix
             
         Returns:
             Gemini response object
         """
         print(f"[Generator] Calling Gemini ({self.config.model})...")
         
-        # Configure generation settings
-        generation_config = types.GenerateContentConfig(
-            temperature=self.config.temperature,
-            max_output_tokens=self.config.max_output_tokens,
-            response_mime_type="application/json",
-            response_schema=OUTPUT_SCHEMA
-        )
+        request_args = self._request_args(user_prompt, context_prompt)
+        for attempt in range(1, _MAX_ATTEMPTS + 1):
+            try:
+                response = self.client.models.generate_content(**request_args)
+                break
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                time.sleep(delay)
         
-        # Make the API call
-        response = self.client.models.generate_content(
-            model=self.config.model,
-            contents=[
+        self._check_finish_reason(response)
+        return response
+    
+    async def _call_gemini_async(
+        self,
+        user_prompt: str,
+        context_prompt: str = ""
+    ) -> "types.GenerateContentResponse":
+        """Async variant of _call_gemini() using the client's aio surface."""
+        print(f"[Generator] Calling Gemini ({self.config.model})...")
+        
+        request_args = self._request_args(user_prompt, context_prompt)
+        for attempt in range(1, _MAX_ATTEMPTS + 1):
+            try:
+                response = await self.client.aio.models.generate_content(**request_args)
+                break
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+        
+        self._check_finish_reason(response)
+        return response
+    
+    def _retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """
+        Decide whether a failed Gemini call should be retried.
+        
+        Args:
+            error: Exception raised by the call
+            attempt: Number of the attempt that failed (1-based)
+            
+        Returns:
+            Seconds to wait before retrying, or None to re-raise the error
+        """
+        from google.genai import errors
+        
+        if not isinstance(error, errors.APIError) or error.code not in _RETRYABLE_STATUS_CODES:
+            return None
+        if attempt >= _MAX_ATTEMPTS:
+            return None
+        
+        # Prefer the server's Retry-After (in seconds) over our own backoff
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        try:
+            delay = float(headers.get("retry-after"))
+        except (TypeError, ValueError):
+            delay = 2 ** (attempt - 1) + random.uniform(0, 1)
+        delay = min(delay, _MAX_RETRY_DELAY_SECONDS)
+        
+        print(f"[Generator] Gemini returned {error.code}, retrying in {delay:.1f}s "
+              f"(attempt {attempt + 1}/{_MAX_ATTEMPTS})")
+        return delay
+    
+    def _request_args(self, user_prompt: str, context_prompt: str) -> dict:
+        """Build the generate_content() keyword arguments for a prompt."""
+        from google.genai import types
+        
+        return {
+            "model": self.config.model,
+            "contents": [
                 types.Content(
                     role="user",
                     parts=[
-                        types.Part(text=SYSTEM_PROMPT),
-                        types.Part(text=user_prompt)
+                        self._system_part,
+                        types.Part(text=user_prompt),
+                        *([types.Part(text=context_prompt)] if context_prompt else [])
                     ]
                 )
             ],
-            config=generation_config
-        )
+            "config": self._generation_config
+        }
+    
+    def _call_gemini_stream(
+        self,
+        user_prompt: str,
+        context_prompt: str = ""
+    ) -> Iterator["types.GenerateContentResponse"]:
+        """Streaming variant of _call_gemini(); yields response chunks as they arrive."""
+        print(f"[Generator] Streaming from Gemini ({self.config.model})...")
         
+        return self.client.models.generate_content_stream(
+            **self._request_args(user_prompt, context_prompt)
+        )
+    
+    def _check_finish_reason(self, response: "types.GenerateContentResponse") -> None:
+        """Report the finish reason and warn if the response was truncated."""
         print(f"[Generator] Response received")
 
         # Check if response was truncated
@@ -396,12 +908,22 @@ Generate corrected tests that address these errors.
             if str(finish_reason) in ('MAX_TOKENS', '2', 'FINISH_REASON_MAX_TOKENS'):
                 print("[Generator] WARNING: Response was truncated due to max_tokens limit")
                 print(f"[Generator] Current max_output_tokens: {self.config.max_output_tokens}")
-
-        return response
+    
+    def _parse_and_store(
+        self,
+        response: "types.GenerateContentResponse",
+        language: str,
+        cache_key: Optional[str]
+    ) -> GenerationResult:
+        """Parse a fresh response and cache it if it parsed cleanly."""
+        result = self._parse_response(response, language)
+        if result.raw_response:
+            self._put_cached_response(cache_key, result.raw_response)
+        return result
     
     def _parse_response(
         self,
-        response: types.GenerateContentResponse,
+        response: "types.GenerateContentResponse",
         language: str
     ) -> GenerationResult:
         """
@@ -414,20 +936,11 @@ Generate corrected tests that address these errors.
         Returns:
             Parsed GenerationResult
         """
-        # Extract token usage
-        token_usage = {}
-        if hasattr(response, 'usage_metadata') and response.usage_metadata:
-            token_usage = {
-                "prompt_tokens": response.usage_metadata.prompt_token_count,
-                "completion_tokens": response.usage_metadata.candidates_token_count,
-                "total_tokens": response.usage_metadata.total_token_count
-            }
-            print(f"[Generator] Tokens - Prompt: {token_usage.get('prompt_tokens', 'N/A')}, "
-                  f"Completion: {token_usage.get('completion_tokens', 'N/A')}")
+        token_usage = self._token_usage(response)
         
         # Parse JSON response
         try:
-            raw_response = json.loads(response.text)
+            raw_response = _json_loads(response.text)
         except json.JSONDecodeError as e:
             print(f"[Generator] ERROR: Failed to parse JSON response: {e}")
             print(f"[Generator] Raw response: {response.text[:500]}...")
@@ -446,9 +959,54 @@ Generate corrected tests that address these errors.
                 token_usage=token_usage
             )
         
-        # Parse analysis
-        analysis_data = raw_response.get("analysis", {})
-        analysis = AnalysisResult(
+        return self._build_result(raw_response, language, token_usage)
+    
+    def _token_usage(self, response: "types.GenerateContentResponse") -> dict:
+        """Extract (and report) token usage from a response."""
+        token_usage = {}
+        if hasattr(response, 'usage_metadata') and response.usage_metadata:
+            token_usage = {
+                "prompt_tokens": response.usage_metadata.prompt_token_count,
+                "completion_tokens": response.usage_metadata.candidates_token_count,
+                "total_tokens": response.usage_metadata.total_token_count,
+                # Prompt tokens served from Gemini's prefix cache
+                "cached_tokens": getattr(response.usage_metadata, "cached_content_token_count", None)
+            }
+            print(f"[Generator] Tokens - Prompt: {token_usage.get('prompt_tokens', 'N/A')}, "
+                  f"Completion: {token_usage.get('completion_tokens', 'N/A')}")
+        return token_usage
+    
+    def _build_result(
+        self,
+        raw_response: dict,
+        language: str,
+        token_usage: dict
+    ) -> GenerationResult:
+        """
+        Build a GenerationResult from Gemini's decoded JSON output.
+        
+        Args:
+            raw_response: Decoded response JSON
+            language: Programming language for tests
+            token_usage: Token counts reported for the call
+            
+        Returns:
+            GenerationResult
+        """
+        return GenerationResult(
+            analysis=self._build_analysis(raw_response.get("analysis", {})),
+            tests=[
+                self._build_test(test_data, language)
+                for test_data in raw_response.get("tests", [])
+            ],
+            skip_reason=raw_response.get("skip_reason"),
+            raw_response=raw_response,
+            token_usage=token_usage
+        )
+    
+    def _build_analysis(self, analysis_data: dict) -> AnalysisResult:
+        """Build an AnalysisResult from the response's "analysis" object."""
+        return AnalysisResult(
             change_type=analysis_data.get("change_type", "existing_coverage"),
             risk_level=analysis_data.get("risk_level", "low"),
             affected_endpoints=analysis_data.get("affected_endpoints", []),
@@ -456,43 +1014,20 @@ Generate corrected tests that address these errors.
             recommendation=analysis_data.get("recommendation", ""),
             existing_contract_impact=analysis_data.get("existing_contract_impact", "")
         )
-        
-        # Parse tests
-        tests = []
-        for test_data in raw_response.get("tests", []):
-            interactions = []
-            for interaction_data in test_data.get("interactions", []):
-                request_data = interaction_data.get("request", {})
-                response_data = interaction_data.get("response", {})
-                
-                interactions.append(GeneratedInteraction(
-                    description=interaction_data.get("description", ""),
-                    provider_state=interaction_data.get("provider_state", ""),
-                    request_method=request_data.get("method", "GET"),
-                    request_path=request_data.get("path", "/"),
-                    request_headers=request_data.get("headers", ""),
-                    request_body=request_data.get("body", ""),
-                    response_status=response_data.get("status", 200),
-                    response_headers=response_data.get("headers", ""),
-                    response_body=response_data.get("body", "")
-                ))
-            
-            tests.append(GeneratedTest(
-                filename=test_data.get("filename", "pact_test"),
-                description=test_data.get("description", ""),
-                consumer_name=test_data.get("consumer_name", ""),
-                provider_name=test_data.get("provider_name", ""),
-                interactions=interactions,
-                code=test_data.get("code", ""),
-                language=language
-            ))
-        
-        return GenerationResult(
-            analysis=analysis,
-            tests=tests,
-            skip_reason=raw_response.get("skip_reason"),
-            raw_response=raw_response,
-            token_usage=token_usage
+    
+    def _build_test(self, test_data: dict, language: str) -> GeneratedTest:
+        """Build a GeneratedTest from one element of the response's "tests" array."""
+        return GeneratedTest(
+            filename=test_data.get("filename", "pact_test"),
+            description=test_data.get("description", ""),
+            consumer_name=test_data.get("consumer_name", ""),
+            provider_name=test_data.get("provider_name", ""),
+            interactions=[
+                _build_interaction(interaction_data)
+                for interaction_data in test_data.get("interactions", [])
+            ],
+            code=test_data.get("code", ""),
+            language=language
         )
     
     def count_tokens(self, text: str) -> int:
@@ -505,8 +1040,19 @@ Generate corrected tests that address these errors.
         Returns:
             Token count
         """
+        # Counting is a network round trip, and retries re-count the same
+        # text, so remember counts by content hash
+        key = hashlib.sha256(text.encode("utf-8")).digest()
+        count = self._token_counts.get(key)
+        if count is not None:
+            return count
+        
         response = self.client.models.count_tokens(
             model=self.config.model,
             contents=text
         )
+        if len(self._token_counts) >= _TOKEN_COUNT_CACHE_SIZE:
+            # Drop the oldest entry (dicts keep insertion order)
+            del self._token_counts[next(iter(self._token_counts))]
+        self._token_counts[key] = response.total_tokens
         return response.total_tokens
@@ -6,7 +6,8 @@ and generate Pact contract tests.
 
 Components:
 - SYSTEM_PROMPT: Defines AI's role, rules, and output format
-- USER_PROMPT_TEMPLATE: Template for injecting context
+- USER_PROMPT_TEMPLATE: Repo/language-specific instructions (stable prompt prefix)
+- USER_CONTEXT_TEMPLATE: Template for injecting the PR context
 - OUTPUT_SCHEMA: JSON schema for structured output
 - REVISION_PROMPT_TEMPLATE: Template for ai-revise feedback loop
 
@@ -346,8 +347,11 @@ OUTPUT_SCHEMA = {
 # USER PROMPT TEMPLATE
 # =============================================================================
 
+# The user prompt is sent as two parts: the instructions, which only vary
+# with repo/language/Pact library, come first so Gemini can reuse its cached
+# prompt prefix across PRs; the PR-specific context follows.
 USER_PROMPT_TEMPLATE = """## Task
-Generate Pact consumer contract tests for the following codebase.
+Generate Pact consumer contract tests for the codebase described in the context below.
 
 ## Repository Name
 {repo_name}
@@ -358,9 +362,6 @@ Generate Pact consumer contract tests for the following codebase.
 ## Pact Library
 {pact_library_info}
 
-## Context
-{context}
-
 ## Step-by-Step Instructions
 
 1. **Determine consumer name**: Use the repository name above: `{repo_name}`. This is your consumer name.
@@ -386,6 +387,10 @@ Generate Pact consumer contract tests for the following codebase.
 Respond with valid JSON only, matching the required schema.
 """
 
+USER_CONTEXT_TEMPLATE = """## Context
+{context}
+"""
+
 # =============================================================================
 # HELPER FUNCTIONS
 # =============================================================================
@@ -423,15 +428,15 @@ def get_pact_library_prompt(language: str, pact_config: dict) -> str:
     return "\n".join(prompt_parts)
 
 
-def build_user_prompt(
+def build_user_prompt_parts(
     language: str,
     pact_config: dict,
     compressed_context: str,
     file_naming_convention: str,
     repo_name: str = "unknown"
-) -> str:
+) -> tuple[str, str]:
     """
-    Build the complete user prompt with compressed context.
+    Build the user prompt as a stable instructions part and a context part.
 
     Args:
         language: Detected programming language
@@ -441,7 +446,8 @@ def build_user_prompt(
         repo_name: Repository name (e.g., "pact-implementation") used for consumer naming
 
     Returns:
-        Complete user prompt ready to send to Gemini
+        Tuple of (instructions, context); send them in this order so the
+        instructions form a prefix shared by every PR of the repository
     """
     pact_library_info = get_pact_library_prompt(language, pact_config)
 
@@ -449,13 +455,39 @@ def build_user_prompt(
     if "/" in repo_name:
         repo_name = repo_name.split("/")[-1]
 
-    return USER_PROMPT_TEMPLATE.format(
+    instructions = USER_PROMPT_TEMPLATE.format(
         language=language,
         pact_library_info=pact_library_info,
-        context=compressed_context,
         file_naming_convention=file_naming_convention or "standard",
         repo_name=repo_name
     )
+    return instructions, USER_CONTEXT_TEMPLATE.format(context=compressed_context)
+
+
+def build_user_prompt(
+    language: str,
+    pact_config: dict,
+    compressed_context: str,
+    file_naming_convention: str,
+    repo_name: str = "unknown"
+) -> str:
+    """
+    Build the complete user prompt with compressed context.
+
+    Args:
+        language: Detected programming language
+        pact_config: Pact library configuration from detection.yaml
+        compressed_context: Pre-formatted compressed context from compressor
+        file_naming_convention: Expected test file naming pattern
+        repo_name: Repository name (e.g., "pact-implementation") used for consumer naming
+
+    Returns:
+        Complete user prompt ready to send to Gemini
+    """
+    instructions, context = build_user_prompt_parts(
+        language, pact_config, compressed_context, file_naming_convention, repo_name
+    )
+    return f"{instructions}\n{context}"
 
 
 # =============================================================================
@@ -489,19 +521,23 @@ Respond with valid JSON only.
 """
 
 
-def build_revision_prompt(previous_tests: list[str], feedback: str, language: str) -> str:
+def build_revision_prompt(previous_tests: str | list[str], feedback: str, language: str) -> str:
     """
     Build a revision prompt when developer requests changes.
 
     Args:
-        previous_tests: List of previously generated test code strings
+        previous_tests: Previously generated test code, either already joined
+            (see GenerationResult.joined_test_code) or as a list of strings
         feedback: Developer's feedback/comments
         language: Programming language for the tests
 
     Returns:
         Complete revision prompt
     """
-    tests_text = "\n\n---\n\n".join(previous_tests)
+    if isinstance(previous_tests, str):
+        tests_text = previous_tests
+    else:
+        tests_text = "\n\n---\n\n".join(previous_tests)
 
     return REVISION_PROMPT_TEMPLATE.format(
         previous_tests=tests_text,
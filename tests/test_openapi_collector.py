@@ -0,0 +1,73 @@
+"""Tests for the JSON copy OpenAPICollector keeps of YAML specs."""
+
+import json
+
+from src.context_collector import openapi_collector
+from src.context_collector.openapi_collector import OpenAPICollector
+
+SPEC_WITH_DATE = """\
+openapi: 3.0.0
+info:
+  title: Orders API
+  version: 1.0.0
+paths:
+  /orders:
+    get:
+      summary: List orders
+      parameters:
+        - name: since
+          in: query
+          schema:
+            type: string
+            format: date
+            example: 2024-01-01
+      responses:
+        200:
+          description: OK
+"""
+
+
+def _collect(path):
+    OpenAPICollector._mem_cache.clear()
+    return OpenAPICollector().collect_from_file(str(path))
+
+
+def test_yaml_with_date_writes_json_copy(tmp_path, monkeypatch):
+    monkeypatch.delenv("CONTEXT_CACHE_DIR", raising=False)
+    spec_path = tmp_path / "openapi.yaml"
+    spec_path.write_text(SPEC_WITH_DATE)
+
+    context = _collect(spec_path)
+
+    copy_path = tmp_path / ".openapi.yaml.cache.json"
+    copy = json.loads(copy_path.read_text())
+    assert copy["spec"]["paths"]["/orders"]["get"]["parameters"][0]["schema"]["example"] == "2024-01-01"
+    assert [e.path for e in context.endpoints] == ["/orders"]
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_yaml_is_read_from_matching_json_copy(tmp_path, monkeypatch):
+    monkeypatch.delenv("CONTEXT_CACHE_DIR", raising=False)
+    spec_path = tmp_path / "openapi.yaml"
+    spec_path.write_text(SPEC_WITH_DATE)
+    _collect(spec_path)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("YAML parsed despite a matching JSON copy")
+
+    monkeypatch.setattr(openapi_collector.yaml, "load", fail)
+    context = _collect(spec_path)
+
+    assert context.title == "Orders API"
+
+
+def test_stale_json_copy_is_ignored(tmp_path, monkeypatch):
+    monkeypatch.delenv("CONTEXT_CACHE_DIR", raising=False)
+    spec_path = tmp_path / "openapi.yaml"
+    spec_path.write_text(SPEC_WITH_DATE)
+    _collect(spec_path)
+
+    spec_path.write_text(SPEC_WITH_DATE.replace("Orders API", "Billing API"))
+    context = _collect(spec_path)
+
+    assert context.title == "Billing API"